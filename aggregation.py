@@ -0,0 +1,169 @@
+"""Parallel aggregation of ingredient demand across many meal plans.
+
+Plans are reduced to compact records of recipe ids, optionally with a group key
+such as a region or a date:
+
+    (group, [recipe_id, recipe_id, ...])
+
+Each worker process counts recipe occurrences in its chunk of records and turns
+the counts into one dense vector of ingredient amounts per group (indexed by
+ingredient id, in the ingredient's base unit). The partial vectors are summed
+as they come back, so memory stays proportional to the number of in-flight
+chunks and never to the number of plans.
+"""
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+from pricing import parse_quantity
+
+# Recipe matrix shared with worker processes by the pool initializer.
+_worker_matrix = None
+_worker_width = 0
+
+
+class DemandMatrix:
+    """Sparse recipe -> (ingredient id, amount) rows and the ingredient vocabulary they index.
+
+    Ingredients with different base units (for example "onion" counted and
+    "onion" in grams) get separate columns. Quantities that cannot be parsed are
+    counted in `unparsed` and left out of the demand.
+    """
+
+    def __init__(self, recipes):
+        """Builds the matrix from an iterable of recipes with assigned recipe ids."""
+        self.columns = []  # ingredient id -> (ingredient, unit)
+        self._column_ids = {}
+        self.rows = {}  # recipe id -> (array of ingredient ids, array of amounts)
+        self.unparsed = {}  # recipe id -> ingredients whose quantity could not be parsed
+        for recipe in recipes:
+            ingredient_ids = array("l")
+            amounts = array("d")
+            for ingredient, quantity in recipe.ingredients.items():
+                parsed = parse_quantity(quantity)
+                if parsed is None:
+                    self.unparsed.setdefault(recipe.recipe_id, []).append(ingredient)
+                    continue
+                ingredient_ids.append(self._column_id(ingredient.strip().lower(), parsed[1]))
+                amounts.append(parsed[0])
+            self.rows[recipe.recipe_id] = (ingredient_ids, amounts)
+
+    def _column_id(self, ingredient, unit):
+        key = (ingredient, unit)
+        column_id = self._column_ids.get(key)
+        if column_id is None:
+            column_id = self._column_ids[key] = len(self.columns)
+            self.columns.append(key)
+        return column_id
+
+    def to_dict(self, vector):
+        """Converts a dense demand vector into {ingredient: {unit: amount}}, omitting zero entries."""
+        demand = {}
+        for (ingredient, unit), amount in zip(self.columns, vector):
+            if amount:
+                demand.setdefault(ingredient, {})[unit] = round(amount, 2)
+        return demand
+
+
+def plan_record(meal_plan, group=None):
+    """Returns the (group, recipe ids) record of a MealPlan."""
+    return group, [recipe.recipe_id for meals in meal_plan.meals.values()
+                   for recipe in meals.values() if recipe is not None]
+
+
+def _reduce_chunk(records, matrix, width):
+    """Reduces a chunk of (group, recipe ids) records to {group: dense demand vector}."""
+    counts = {}
+    for group, recipe_ids in records:
+        group_counts = counts.get(group)
+        if group_counts is None:
+            group_counts = counts[group] = Counter()
+        group_counts.update(recipe_ids)
+
+    vectors = {}
+    for group, group_counts in counts.items():
+        vector = array("d", bytes(8 * width))
+        for recipe_id, count in group_counts.items():
+            row = matrix.get(recipe_id)
+            if row is None:
+                continue
+            for ingredient_id, amount in zip(*row):
+                vector[ingredient_id] += amount * count
+        vectors[group] = vector
+    return vectors
+
+
+def _init_worker(matrix, width):
+    global _worker_matrix, _worker_width
+    _worker_matrix = matrix
+    _worker_width = width
+
+
+def _reduce_chunk_in_worker(records):
+    return _reduce_chunk(records, _worker_matrix, _worker_width)
+
+
+def _merge(totals, partial):
+    for group, vector in partial.items():
+        total = totals.get(group)
+        if total is None:
+            totals[group] = vector
+        else:
+            for i, amount in enumerate(vector):
+                if amount:
+                    total[i] += amount
+
+
+def _chunks(records, chunk_size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def aggregate_demand(records, matrix, workers=None, chunk_size=10000, max_pending=None):
+    """Aggregates ingredient demand over (group, recipe ids) records.
+
+    Returns {group: dense demand vector}; use matrix.to_dict to read a vector by
+    ingredient name. Records are consumed lazily, so `records` may be a generator
+    over millions of plans. With workers=1 everything runs in this process.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    workers = workers or os.cpu_count() or 1
+    width = len(matrix.columns)
+    totals = {}
+
+    if workers == 1:
+        for chunk in _chunks(records, chunk_size):
+            _merge(totals, _reduce_chunk(chunk, matrix.rows, width))
+        return totals
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(matrix.rows, width)) as executor:
+        pending = []
+        for chunk in _chunks(records, chunk_size):
+            pending.append(executor.submit(_reduce_chunk_in_worker, chunk))
+            if len(pending) >= max_pending:
+                _merge(totals, pending.pop(0).result())
+        for future in pending:
+            _merge(totals, future.result())
+    return totals
+
+
+def aggregate_meal_plans(meal_plans, recipes, group_by=None, workers=None, chunk_size=10000):
+    """Aggregates ingredient demand over MealPlan objects.
+
+    `group_by` is an optional function mapping a plan to its group (for example a
+    region or a week); without it all plans fall into the group None. Returns
+    {group: {ingredient: {unit: amount}}}. Food on hand is not subtracted, since
+    this is gross purchasing demand.
+    """
+    matrix = DemandMatrix(recipes)
+    records = (plan_record(meal_plan, group_by(meal_plan) if group_by else None) for meal_plan in meal_plans)
+    totals = aggregate_demand(records, matrix, workers=workers, chunk_size=chunk_size)
+    return {group: matrix.to_dict(vector) for group, vector in totals.items()}
@@ -0,0 +1,458 @@
+"""Single-pass catalogue statistics and health checks with bounded memory.
+
+CatalogueAnalyzer consumes recipes one at a time (from a RecipeDatabase or
+straight from a recipe stream) and never keeps them. Exact counters are used
+only for the small vocabularies of cuisines and taxonomy dietary tags;
+everything that grows with the catalogue goes into fixed-size sketches:
+
+* CountMinSketch: per-ingredient and per-explicit-tag recipe counts, with a
+  bounded set of heavy-hitter candidates for the most used ones;
+* HyperLogLog: number of distinct ingredient names and explicit tags;
+* QuantileSketch: cost distribution, log-bucketed with a relative error bound;
+* a bottom-k sample of explicit tags (those with the smallest hashes) with
+  exact counts, from which the number of orphan tags is estimated.
+
+Ingredient and tag occurrences are counted exactly per chunk of recipes and
+flushed into the sketches once per distinct name, so the per-recipe work stays
+small:
+
+    analyzer = CatalogueAnalyzer()
+    for recipe in recipes:
+        analyzer.add(recipe)
+    report = analyzer.report()  # JSON-serializable dict
+"""
+from collections import Counter
+import hashlib
+import heapq
+import math
+
+import taxonomy
+from pricing import parse_quantity
+
+_HASH_MASK = (1 << 64) - 1  # Used to keep shifted hashes to 64 bits
+_UNPARSEABLE = 1  # parse_quantity() cannot read the quantity
+_NON_NUMERIC = 2  # float() cannot read the quantity
+
+
+def _hash64(key):
+    """Returns a 64-bit hash of a string that is the same in every process (unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class CountMinSketch:
+    """Approximate counts of string keys in `depth` x `width` counters.
+
+    Estimates never undercount; they overcount by at most 2 * total / width
+    with probability 1 - (1/2) ** depth.
+    """
+
+    def __init__(self, width=1 << 16, depth=4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _positions(self, key):
+        h = _hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        """Adds `count` occurrences of `key` and returns its new estimate."""
+        self.total += count
+        estimate = None
+        for row, position in zip(self._rows, self._positions(key)):
+            row[position] += count
+            estimate = row[position] if estimate is None else min(estimate, row[position])
+        return estimate
+
+    def update(self, counts):
+        """Adds a {key: count} mapping and returns {key: new estimate}."""
+        rows, width, depth = self._rows, self.width, self.depth
+        estimates = {}
+        for key, count in counts.items():
+            h = _hash64(key)
+            h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+            estimate = None
+            for i in range(depth):
+                row = rows[i]
+                position = (h1 + i * h2) % width
+                value = row[position] + count
+                row[position] = value
+                if estimate is None or value < estimate:
+                    estimate = value
+            estimates[key] = estimate
+            self.total += count
+        return estimates
+
+    def estimate(self, key):
+        """Returns the estimated count of `key`."""
+        return min(row[position] for row, position in zip(self._rows, self._positions(key)))
+
+    def merge(self, other):
+        """Adds the counts of another sketch of the same shape."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different shapes.")
+        for row, other_row in zip(self._rows, other._rows):
+            for position, value in enumerate(other_row):
+                if value:
+                    row[position] += value
+        self.total += other.total
+
+    def error_bound(self):
+        """Returns the additive overcount bound (2 * total / width)."""
+        return math.ceil(2 * self.total / self.width)
+
+
+class HyperLogLog:
+    """Estimates the number of distinct string keys in 2 ** precision registers."""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add(self, key):
+        h = _hash64(key)
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & _HASH_MASK
+        rank = 64 - self.precision + 1 if rest == 0 else 64 - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def update(self, keys):
+        """Adds every key of an iterable."""
+        registers, precision = self._registers, self.precision
+        shift = 64 - precision
+        for key in keys:
+            h = _hash64(key)
+            index = h >> shift
+            rest = (h << precision) & _HASH_MASK
+            rank = shift + 1 if rest == 0 else 64 - rest.bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other):
+        """Adds the keys counted by another sketch of the same precision."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precisions.")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def count(self):
+        """Returns the estimated number of distinct keys added."""
+        m = len(self._registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -register for register in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return round(estimate)
+
+
+class QuantileSketch:
+    """Quantiles of non-negative values within `relative_accuracy` using log-spaced buckets."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = Counter()
+        self._zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value < 0:
+            raise ValueError("QuantileSketch only accepts non-negative values.")
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value == 0:
+            self._zeros += 1
+        else:
+            self._buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def merge(self, other):
+        """Adds the values of another sketch with the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches of different accuracies.")
+        self._buckets.update(other._buckets)
+        self._zeros += other._zeros
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Returns the approximate `q`-quantile (0 <= q <= 1), or None if no value was added."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                value = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class CatalogueAnalyzer:
+    """Accumulates catalogue statistics over a single pass of recipes."""
+
+    def __init__(self, top_k=20, max_samples=20, chunk_size=200000, sketch_width=1 << 16, sketch_depth=4,
+                 cost_accuracy=0.01, tag_sample_size=1024):
+        """Initializes a CatalogueAnalyzer.
+
+        `top_k` ingredients and explicit tags are reported by frequency; at most
+        `max_samples` examples of unparseable quantities and orphan tags are kept;
+        ingredient and tag counts are flushed into the sketches every `chunk_size`
+        recipes; orphan tags are estimated from a sample of `tag_sample_size` tags.
+        """
+        self.top_k = top_k
+        self.max_samples = max_samples
+        self.chunk_size = chunk_size
+        self.recipes = 0
+        self._cuisines = Counter()  # Raw cuisine names; normalized in report()
+        self._tag_masks = Counter()  # (taxonomy mask, explicit taxonomy tags) -> recipes
+        self.costs = QuantileSketch(cost_accuracy)
+        self.missing_costs = 0  # Recipes without a (valid) cost
+        self.ingredient_counts = CountMinSketch(sketch_width, sketch_depth)
+        self.distinct_ingredients = HyperLogLog()
+        self._heavy_hitters = {}  # ingredient -> estimate, at most 4 * top_k candidates
+        self.tag_counts = CountMinSketch(sketch_width, sketch_depth)  # Explicit tags outside the taxonomy
+        self.distinct_tags = HyperLogLog()
+        self._tag_heavy_hitters = {}  # tag -> estimate, at most 4 * top_k candidates
+        self.tag_sample_size = tag_sample_size
+        self._tag_sample = {}  # tag -> [hash, exact recipe count] for the tags with the smallest hashes
+        self._chunk_ingredients = Counter()
+        self._chunk_tags = Counter()
+        self._chunk_recipes = 0
+        self.quantity_entries = 0
+        self.unparseable = {"recipes": 0, "entries": 0, "samples": []}
+        self.non_numeric = {"recipes": 0, "entries": 0}
+        self._quantity_flags = {}  # quantity -> _UNPARSEABLE | _NON_NUMERIC flags
+
+    def add(self, recipe):
+        """Adds one recipe to the statistics."""
+        self.recipes += 1
+        self._cuisines[recipe.cuisine] += 1
+
+        # Taxonomy tags are counted per distinct (mask, explicit taxonomy tags) combination and
+        # expanded in report(); other explicit tags go to the tag sketches with the chunk
+        ingredients = {ingredient.strip().lower() for ingredient in recipe.ingredients}
+        mask = recipe.ingredient_mask
+        if mask is None:
+            mask = taxonomy.recipe_mask(ingredients)
+        known = frozenset()
+        if recipe.dietary_info:
+            tags = {tag.lower() for tag in recipe.dietary_info}
+            known = frozenset(tag for tag in tags if tag in taxonomy.DIETARY_EXCLUSIONS)
+            self._chunk_tags.update(tags - known)
+        self._tag_masks[mask, known] += 1
+
+        cost = recipe.cost
+        if cost is None or cost < 0:
+            self.missing_costs += 1
+        else:
+            self.costs.add(cost)
+
+        self._chunk_ingredients.update(ingredients)
+        self._check_quantities(recipe)
+        self._chunk_recipes += 1
+        if self._chunk_recipes >= self.chunk_size:
+            self._flush()
+
+    def add_all(self, recipes):
+        """Adds every recipe of an iterable and returns the analyzer."""
+        for recipe in recipes:
+            self.add(recipe)
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another analyzer created with the same options; returns self."""
+        self._flush()
+        other._flush()
+        self.recipes += other.recipes
+        self._cuisines.update(other._cuisines)
+        self._tag_masks.update(other._tag_masks)
+        self.costs.merge(other.costs)
+        self.missing_costs += other.missing_costs
+        self.ingredient_counts.merge(other.ingredient_counts)
+        self.distinct_ingredients.merge(other.distinct_ingredients)
+        self._heavy_hitters = self._reestimate(self.ingredient_counts, self._heavy_hitters, other._heavy_hitters)
+        self.tag_counts.merge(other.tag_counts)
+        self.distinct_tags.merge(other.distinct_tags)
+        self._tag_heavy_hitters = self._reestimate(self.tag_counts, self._tag_heavy_hitters,
+                                                   other._tag_heavy_hitters)
+        self._sample_tags((tag, count) for tag, (_, count) in other._tag_sample.items())
+        self.quantity_entries += other.quantity_entries
+        for section, other_section in ((self.unparseable, other.unparseable), (self.non_numeric, other.non_numeric)):
+            section["recipes"] += other_section["recipes"]
+            section["entries"] += other_section["entries"]
+        samples = self.unparseable["samples"]
+        samples.extend(other.unparseable["samples"][:self.max_samples - len(samples)])
+        return self
+
+    def _check_quantities(self, recipe):
+        cached = self._quantity_flags.get
+        unparseable = non_numeric = 0
+        for ingredient, quantity in recipe.ingredients.items():
+            try:
+                flags = cached(quantity)
+            except TypeError:  # Unhashable quantity such as a list
+                flags = None
+            if flags is None:
+                flags = self._classify_quantity(quantity)
+            if not flags:
+                continue
+            if flags & _UNPARSEABLE:
+                unparseable += 1
+                if len(self.unparseable["samples"]) < self.max_samples:
+                    self.unparseable["samples"].append({"recipe": recipe.name, "ingredient": ingredient,
+                                                        "quantity": quantity})
+            if flags & _NON_NUMERIC:
+                non_numeric += 1
+        self.quantity_entries += len(recipe.ingredients)
+        if unparseable:
+            self.unparseable["recipes"] += 1
+            self.unparseable["entries"] += unparseable
+        if non_numeric:
+            self.non_numeric["recipes"] += 1
+            self.non_numeric["entries"] += non_numeric
+
+    def _classify_quantity(self, quantity):
+        """Returns the _UNPARSEABLE / _NON_NUMERIC flags of a quantity, caching them."""
+        flags = 0 if parse_quantity(quantity) is not None else _UNPARSEABLE
+        try:
+            float(quantity)
+        except (TypeError, ValueError):
+            flags |= _NON_NUMERIC  # Skipped by MealPlan.get_shopping_list
+        try:
+            if len(self._quantity_flags) >= 100000:
+                self._quantity_flags.clear()
+            self._quantity_flags[quantity] = flags
+        except TypeError:
+            pass
+        return flags
+
+    def _flush(self):
+        """Moves the exact ingredient and tag counts of the current chunk into the sketches."""
+        estimates = self.ingredient_counts.update(self._chunk_ingredients)
+        self.distinct_ingredients.update(self._chunk_ingredients)
+        self._heavy_hitters = self._top_candidates(self._heavy_hitters, estimates)
+        if self._chunk_tags:
+            estimates = self.tag_counts.update(self._chunk_tags)
+            self.distinct_tags.update(self._chunk_tags)
+            self._tag_heavy_hitters = self._top_candidates(self._tag_heavy_hitters, estimates)
+            self._sample_tags(self._chunk_tags.items())
+        self._chunk_ingredients = Counter()
+        self._chunk_tags = Counter()
+        self._chunk_recipes = 0
+
+    def _top_candidates(self, candidates, estimates):
+        """Returns the 4 * top_k heavy-hitter candidates with the largest estimates after a flush."""
+        capacity = 4 * self.top_k
+        candidates.update(heapq.nlargest(capacity, estimates.items(), key=lambda item: item[1]))
+        return dict(heapq.nlargest(capacity, candidates.items(), key=lambda item: item[1]))
+
+    def _reestimate(self, sketch, candidates, other_candidates):
+        """Returns the 4 * top_k candidates of two merged analyzers with the largest estimates in `sketch`."""
+        return dict(heapq.nlargest(4 * self.top_k, ((key, sketch.estimate(key))
+                                                    for key in set(candidates) | set(other_candidates)),
+                                   key=lambda item: item[1]))
+
+    def _sample_tags(self, counts):
+        """Adds (tag, count) pairs to the sample of the tag_sample_size tags with the smallest hashes.
+
+        A tag's hash never changes, so a tag in the final sample was kept from its first
+        occurrence on and its count is exact.
+        """
+        sample = self._tag_sample
+        threshold = max(entry[0] for entry in sample.values()) if len(sample) >= self.tag_sample_size else None
+        for tag, count in counts:
+            entry = sample.get(tag)
+            if entry is not None:
+                entry[1] += count
+                continue
+            tag_hash = _hash64(tag)
+            if threshold is None or tag_hash < threshold:
+                sample[tag] = [tag_hash, count]
+        if len(sample) > self.tag_sample_size:
+            self._tag_sample = dict(heapq.nsmallest(self.tag_sample_size, sample.items(),
+                                                    key=lambda item: item[1][0]))
+
+    def report(self, min_tag_recipes=2):
+        """Returns the statistics as a JSON-serializable dict.
+
+        Tag counts are exact for the taxonomy's dietary tags; of the other explicit tags,
+        the top_k most used are reported. Explicit tags carried by fewer than
+        `min_tag_recipes` recipes and not known to the ingredient taxonomy are orphan
+        tags, reported as {"count": estimated number, "samples": up to max_samples tags}.
+        """
+        self._flush()
+        cuisines = Counter()
+        for cuisine, count in self._cuisines.items():
+            cuisines[cuisine.strip().lower()] += count
+        tags = Counter()  # Explicit and inferred
+        for (mask, explicit), count in self._tag_masks.items():
+            allowed = {tag for tag in explicit if not taxonomy.contradicts(mask, tag)}
+            for tag in allowed.union(taxonomy.dietary_labels(mask)):
+                tags[tag] += count
+        tag_error_bound = self.tag_counts.error_bound()
+        for count, tag in heapq.nlargest(self.top_k, ((self.tag_counts.estimate(tag), tag)
+                                                      for tag in self._tag_heavy_hitters)):
+            if count > tag_error_bound:
+                tags[tag] = count
+        sample = self._tag_sample
+        orphans = sorted(tag for tag, (_, count) in sample.items() if count < min_tag_recipes)
+        orphan_count = len(orphans)
+        if len(sample) >= self.tag_sample_size:  # The sample holds only part of the tags; scale it up
+            orphan_count = round(orphan_count / len(sample) * self.distinct_tags.count())
+        top = heapq.nlargest(self.top_k, ((self.ingredient_counts.estimate(ingredient), ingredient)
+                                          for ingredient in self._heavy_hitters))
+        costs = self.costs
+        error_bound = self.ingredient_counts.error_bound()
+        return {
+            "recipes": self.recipes,
+            "cuisines": dict(cuisines.most_common()),
+            "tags": dict(tags.most_common()),
+            "cost": {
+                "count": costs.count,
+                "missing": self.missing_costs,
+                "min": self._round(costs.min),
+                "max": self._round(costs.max),
+                "mean": round(costs.total / costs.count, 2) if costs.count else None,
+                "quantiles": {f"p{round(q * 100)}": self._round(costs.quantile(q))
+                              for q in (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)},
+                "relative_accuracy": costs.relative_accuracy,
+            },
+            "ingredients": {
+                "occurrences": self.ingredient_counts.total,
+                "distinct_estimate": self.distinct_ingredients.count(),
+                "top": [{"ingredient": ingredient, "recipes": count} for count, ingredient in top
+                        if count > error_bound],  # Smaller counts are indistinguishable from sketch noise
+                "count_error_bound": error_bound,
+            },
+            "quantities": {
+                "entries": self.quantity_entries,
+                "unparseable": self.unparseable,
+                "non_numeric": self.non_numeric,
+            },
+            "orphan_tags": {"count": orphan_count, "samples": orphans[:self.max_samples]},
+        }
+
+    @staticmethod
+    def _round(value):
+        return round(value, 2) if value is not None else None
+
+
+def analyze_catalogue(recipes, **options):
+    """Returns the analytics report of an iterable of recipes or a RecipeDatabase."""
+    recipes = getattr(recipes, "recipes", recipes)
+    return CatalogueAnalyzer(**options).add_all(recipes).report()
@@ -0,0 +1,192 @@
+"""Append-only change log for replicating a RecipeDatabase to long-lived workers.
+
+The writer attaches a ChangeLog to its database (`recipe_database.change_log =
+ChangeLog(directory)`); every add_recipe, update_recipe and remove_recipe is then
+appended as one JSON line with a sequence number:
+
+    {"seq": 42, "op": "update", "recipe_id": 7, "data": {"cost": 4.5}}
+
+A log directory holds at most one snapshot and the segments after it:
+
+    snapshot-000000000040.jsonl   catalogue state after change 40
+    changes-000000000041.jsonl    changes 41, 42, ... (appended to)
+
+Workers keep a ChangeLogFollower and call catch_up() periodically. It remembers
+the segment and byte offset it has read up to, so catching up reads and applies
+only the new events. A follower that falls behind a compaction reloads from the
+snapshot. compact() writes the writer's current state as the new snapshot and
+starts a fresh segment.
+"""
+import json
+import os
+
+_SNAPSHOT_PREFIX = "snapshot-"
+_SEGMENT_PREFIX = "changes-"
+_SUFFIX = ".jsonl"
+
+
+class ChangeLogError(Exception):
+    """Raised when a change log is inconsistent or cannot be written."""
+
+
+def _file_name(prefix, seq):
+    return f"{prefix}{seq:012d}{_SUFFIX}"
+
+
+def _list_files(directory, prefix):
+    """Returns [(seq, path)] for files with `prefix` in `directory`, sorted by seq."""
+    files = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(_SUFFIX):
+            try:
+                files.append((int(name[len(prefix):-len(_SUFFIX)]), os.path.join(directory, name)))
+            except ValueError:
+                continue
+    return sorted(files)
+
+
+def _read_events(path, offset=0):
+    """Returns (events, offset after the last complete line) reading `path` from `offset`."""
+    with open(path, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+    end = data.rfind(b"\n") + 1  # Ignore a trailing line that is still being written
+    events = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+    return events, offset + end
+
+
+class ChangeLog:
+    """Writer side of the change log."""
+
+    def __init__(self, directory, fsync=False):
+        """Opens (or creates) the change log in `directory`; `fsync` makes every append durable."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self.last_seq = 0
+        snapshots = _list_files(directory, _SNAPSHOT_PREFIX)
+        if snapshots:
+            self.last_seq = snapshots[-1][0]
+        segments = _list_files(directory, _SEGMENT_PREFIX)
+        if segments:
+            start_seq, path = segments[-1]
+            events, _ = _read_events(path)
+            self.last_seq = events[-1]["seq"] if events else max(self.last_seq, start_seq - 1)
+            self._segment_path = path
+        else:
+            self._segment_path = os.path.join(directory, _file_name(_SEGMENT_PREFIX, self.last_seq + 1))
+        self._file = open(self._segment_path, "ab")
+
+    def append(self, operation, recipe_id, data):
+        """Appends a change event and returns its sequence number."""
+        seq = self.last_seq + 1
+        line = json.dumps({"seq": seq, "op": operation, "recipe_id": recipe_id, "data": data}) + "\n"
+        try:
+            self._file.write(line.encode("utf-8"))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except OSError as e:
+            raise ChangeLogError(f"Could not append to change log: {e}")
+        self.last_seq = seq
+        return seq
+
+    def compact(self, recipe_database):
+        """Replaces the log with a snapshot of `recipe_database`, which must reflect every logged change."""
+        snapshot_path = os.path.join(self.directory, _file_name(_SNAPSHOT_PREFIX, self.last_seq))
+        temp_path = f"{snapshot_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(json.dumps({"seq": self.last_seq, "count": len(recipe_database.recipes)}) + "\n")
+                for recipe in recipe_database.recipes:
+                    file.write(json.dumps({"recipe_id": recipe.recipe_id, "data": recipe.to_dict()}) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, snapshot_path)
+        except OSError as e:
+            raise ChangeLogError(f"Could not write change log snapshot: {e}")
+
+        self._file.close()
+        self._segment_path = os.path.join(self.directory, _file_name(_SEGMENT_PREFIX, self.last_seq + 1))
+        self._file = open(self._segment_path, "ab")
+        for seq, path in _list_files(self.directory, _SNAPSHOT_PREFIX):
+            if seq < self.last_seq:
+                os.remove(path)
+        for seq, path in _list_files(self.directory, _SEGMENT_PREFIX):
+            if path != self._segment_path:
+                os.remove(path)
+        return snapshot_path
+
+    def close(self):
+        """Closes the current segment."""
+        self._file.close()
+
+
+class ChangeLogFollower:
+    """Reader side of the change log: keeps a RecipeDatabase in sync by applying new events.
+
+    The database is created on the first catch_up() and replaced when the follower has
+    to reload a snapshot, so always access it through `follower.recipe_database`.
+    """
+
+    def __init__(self, directory, recipe_database_factory):
+        """Initializes a follower; `recipe_database_factory` creates an empty RecipeDatabase."""
+        self.directory = directory
+        self.recipe_database_factory = recipe_database_factory
+        self.recipe_database = None
+        self.applied_seq = 0
+        self._segment = None  # (start seq, path) of the segment being read
+        self._offset = 0
+
+    def catch_up(self):
+        """Applies every change logged since the last call and returns the number applied."""
+        segments = _list_files(self.directory, _SEGMENT_PREFIX)
+        if self.recipe_database is None or (segments and segments[0][0] > self.applied_seq + 1):
+            self._load_snapshot()
+
+        applied = 0
+        for start_seq, path in _list_files(self.directory, _SEGMENT_PREFIX):
+            if self._segment is not None and start_seq < self._segment[0]:
+                continue
+            if self._segment is None or start_seq > self._segment[0]:
+                if start_seq > self.applied_seq + 1:
+                    raise ChangeLogError(f"Change log is missing changes {self.applied_seq + 1}-{start_seq - 1}.")
+                self._segment, self._offset = (start_seq, path), 0
+            try:
+                events, self._offset = _read_events(path, self._offset)
+            except FileNotFoundError:
+                return applied + self.catch_up()  # Compacted while reading; resume from the new snapshot
+            for event in events:
+                if event["seq"] <= self.applied_seq:
+                    continue
+                if event["seq"] != self.applied_seq + 1:
+                    raise ChangeLogError(f"Expected change {self.applied_seq + 1}, found {event['seq']}.")
+                self.recipe_database.apply_change(event)
+                self.applied_seq = event["seq"]
+                applied += 1
+        return applied
+
+    def _load_snapshot(self):
+        for _ in range(3):
+            try:
+                return self._read_snapshot()
+            except FileNotFoundError:
+                continue  # Replaced by a concurrent compaction; read the newer one
+        raise ChangeLogError("Snapshot kept changing while it was being read.")
+
+    def _read_snapshot(self):
+        recipe_database = self.recipe_database_factory()
+        seq = 0
+        snapshots = _list_files(self.directory, _SNAPSHOT_PREFIX)
+        if snapshots:
+            seq, path = snapshots[-1]
+            with open(path, encoding="utf-8") as file:
+                header = json.loads(file.readline())
+                for line in file:
+                    entry = json.loads(line)
+                    recipe_database.apply_change({"op": "add", "recipe_id": entry["recipe_id"], "data": entry["data"]})
+            if header.get("seq") != seq:
+                raise ChangeLogError(f"Snapshot '{path}' has an inconsistent header.")
+        self.recipe_database = recipe_database
+        self.applied_seq = seq
+        self._segment, self._offset = None, 0
@@ -0,0 +1,356 @@
+"""Non-interactive command-line interface for the Mindful Meal Planner.
+
+Every subcommand reads recipes and profiles from files (or stdin with "-") and
+writes JSON to stdout, so it can be driven from cron jobs and pipelines.
+Diagnostics go to stderr. The exit status is 0 on success, 1 when a command
+has no result (such as a plan when no recipe matches the profile) and 2 for
+invalid input. Modules are imported inside the subcommand that needs them to
+keep start-up fast; the Tk interface is never imported.
+
+Usage:
+    python main.py import recipes.json -o catalogue.jsonl
+    python main.py search --recipes catalogue.jsonl --cuisine Italian --diet vegetarian
+    python main.py plan --recipes catalogue.jsonl --profile profile.json --seed 7
+    python main.py plan --recipes catalogue.jsonl --history plan_history --user alice
+    python main.py shopping-list --recipes catalogue.jsonl --plan plan.json
+    python main.py export --recipes catalogue.jsonl --format csv
+    python main.py snapshot --recipes catalogue.jsonl -o catalogue.snap
+    python main.py analytics --recipes part-*.jsonl --workers 4
+"""
+import argparse
+import json
+import sys
+
+
+class CLIError(Exception):
+    """Raised for invalid command-line input; reported on stderr with exit status 2."""
+
+
+def _open_input(path):
+    """Opens `path` for reading, treating "-" as stdin."""
+    if path == "-":
+        return sys.stdin
+    try:
+        return open(path, encoding="utf-8")
+    except OSError as e:
+        raise CLIError(f"Cannot open '{path}': {e}")
+
+
+def _read_records(path):
+    """Yields (line number, record) pairs from a JSON array or a JSON-lines file."""
+    stream = _open_input(path)
+    try:
+        first_line = stream.readline()
+        if first_line.lstrip().startswith("["):
+            try:
+                records = json.loads(first_line + stream.read())
+            except json.JSONDecodeError as e:
+                raise CLIError(f"{path}: invalid JSON: {e}")
+            for index, record in enumerate(records):
+                yield index + 1, record
+            return
+
+        line_number = 1
+        line = first_line
+        while line:
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise CLIError(f"{path}:{line_number}: invalid JSON: {e}")
+            line = stream.readline()
+            line_number += 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _read_json(path):
+    """Reads a single JSON document from `path`."""
+    stream = _open_input(path)
+    try:
+        return json.load(stream)
+    except json.JSONDecodeError as e:
+        raise CLIError(f"{path}: invalid JSON: {e}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _read_profile(path):
+    """Reads a UserProfile from a JSON file."""
+    from main import UserProfile
+
+    try:
+        return UserProfile.from_dict(_read_json(path))
+    except (TypeError, ValueError) as e:
+        raise CLIError(f"{path}: invalid profile: {e}")
+
+
+def _iter_recipes(paths, strict=False):
+    """Yields Recipe objects from the given files, reporting invalid entries on stderr."""
+    from main import Recipe
+
+    for path in paths:
+        for line_number, record in _read_records(path):
+            try:
+                yield Recipe.from_dict(record)
+            except (TypeError, ValueError) as e:
+                if strict:
+                    raise CLIError(f"{path}:{line_number}: invalid recipe: {e}")
+                print(f"Warning: {path}:{line_number}: skipping invalid recipe: {e}", file=sys.stderr)
+
+
+def _load_database(paths):
+    """Builds a RecipeDatabase from the given recipe files."""
+    from main import RecipeDatabase
+
+    recipe_database = RecipeDatabase()
+    for recipe in _iter_recipes(paths):
+        recipe_database.add_recipe(recipe)
+    return recipe_database
+
+
+def _write_json(data):
+    json.dump(data, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def _write_json_lines(records):
+    for record in records:
+        sys.stdout.write(json.dumps(record))
+        sys.stdout.write("\n")
+
+
+def cmd_import(args):
+    """Validates recipe files and writes them out as a normalized JSON-lines catalogue."""
+    imported = 0
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for recipe in _iter_recipes(args.sources, strict=args.strict):
+            output.write(json.dumps(recipe.to_dict()))
+            output.write("\n")
+            imported += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Imported {imported} recipes.", file=sys.stderr)
+    return 0
+
+
+def cmd_search(args):
+    """Writes the recipes matching the given criteria as JSON lines."""
+    from query import And, CostBetween, Cuisine, HasIngredient, HasTag, MaxIngredients, Not
+
+    recipe_database = _load_database(args.recipes)
+    terms = []
+    if args.cuisine:
+        terms.append(Cuisine(*args.cuisine))
+    terms.extend(HasTag(tag) for tag in args.diet or [])
+    terms.extend(HasIngredient(ingredient) for ingredient in args.ingredient or [])
+    terms.extend(Not(HasIngredient(ingredient)) for ingredient in args.exclude_ingredient or [])
+    if args.min_cost is not None or args.max_cost is not None:
+        try:
+            terms.append(CostBetween(args.min_cost, args.max_cost))
+        except ValueError as e:
+            raise CLIError(str(e))
+    if args.max_ingredients is not None:
+        terms.append(MaxIngredients(args.max_ingredients))
+
+    if terms:
+        results = recipe_database.query(And(*terms), limit=args.limit, order_by_cost=args.cheapest)
+    else:
+        results = recipe_database.search_recipes()
+        if args.cheapest:
+            results = sorted(results, key=lambda recipe: (recipe.cost is None, recipe.cost or 0))
+        results = results[:args.limit] if args.limit is not None else results
+    _write_json_lines(recipe.to_dict() for recipe in results)
+    return 0
+
+
+def cmd_plan(args):
+    """Generates a weekly meal plan for a profile and writes it as JSON."""
+    from contextlib import redirect_stdout
+    from main import MindfulMealPlanner, UserProfile
+
+    profile = _read_profile(args.profile) if args.profile else UserProfile()
+
+    plan_history = None
+    if args.history:
+        from history import PlanHistory
+        plan_history = PlanHistory(args.history)
+    planner = MindfulMealPlanner(plan_history=plan_history, user_id=args.user)
+    planner.recipe_database = _load_database(args.recipes)
+    with redirect_stdout(sys.stderr):
+        planner.update_user_profile(profile.dietary_restrictions, profile.preferred_cuisines,
+                                    profile.budget, profile.food_on_hand)
+        try:
+            planner.generate_meal_plan(seed=args.seed)
+        except OSError as e:
+            raise CLIError(f"Cannot record the plan in '{args.history}': {e}")
+    meal_plan = planner.get_meal_plan()
+    if not any(recipe for meals in meal_plan.meals.values() for recipe in meals.values()):
+        print("Error: No recipes match the profile; no meal plan was generated.", file=sys.stderr)
+        return 1
+    _write_json(meal_plan.to_dict())
+    return 0
+
+
+def cmd_shopping_list(args):
+    """Writes the shopping list of a saved meal plan as JSON."""
+    from contextlib import redirect_stdout
+    from main import MealPlan
+
+    recipe_database = _load_database(args.recipes)
+    try:
+        meal_plan = MealPlan.from_dict(_read_json(args.plan), recipe_database)
+    except (TypeError, ValueError) as e:
+        raise CLIError(f"{args.plan}: invalid meal plan: {e}")
+    if args.profile:
+        meal_plan.user_profile = _read_profile(args.profile)
+    with redirect_stdout(sys.stderr):
+        shopping_list = meal_plan.get_shopping_list()
+    _write_json(shopping_list)
+    return 0
+
+
+def cmd_export(args):
+    """Writes the recipe catalogue as JSON, JSON lines or CSV."""
+    recipes = _iter_recipes(args.recipes)
+    if args.format == "json":
+        _write_json([recipe.to_dict() for recipe in recipes])
+    elif args.format == "jsonl":
+        _write_json_lines(recipe.to_dict() for recipe in recipes)
+    else:
+        import csv
+
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["name", "cuisine", "dietary_info", "cost", "ingredients", "instructions"])
+        for recipe in recipes:
+            writer.writerow([recipe.name, recipe.cuisine, ";".join(recipe.dietary_info),
+                             "" if recipe.cost is None else recipe.cost,
+                             ";".join(f"{ingredient}:{quantity}" for ingredient, quantity in recipe.ingredients.items()),
+                             "|".join(recipe.instructions)])
+    return 0
+
+
+def cmd_snapshot(args):
+    """Writes the recipe catalogue as a memory-mappable binary snapshot."""
+    from snapshot import SnapshotError, write_snapshot
+
+    recipe_database = _load_database(args.recipes)
+    try:
+        write_snapshot(recipe_database, args.output)
+    except SnapshotError as e:
+        raise CLIError(str(e))
+    print(f"Wrote {len(recipe_database.recipes)} recipes to {args.output}.", file=sys.stderr)
+    return 0
+
+
+def _analyze_files(paths, options):
+    """Returns a CatalogueAnalyzer fed with the recipes of the given files (run in worker processes)."""
+    from analytics import CatalogueAnalyzer
+
+    return CatalogueAnalyzer(**options).add_all(_iter_recipes(paths))
+
+
+def cmd_analytics(args):
+    """Writes catalogue statistics and health checks as a JSON report, reading every recipe once."""
+    import time
+
+    options = {"top_k": args.top, "max_samples": args.samples}
+    started = time.perf_counter()
+    workers = min(args.workers or 1, len(args.recipes))
+    if workers > 1 and "-" not in args.recipes:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(_analyze_files, [[path] for path in args.recipes],
+                                         [options] * len(args.recipes)))
+        analyzer = partials[0]
+        for partial in partials[1:]:
+            analyzer.merge(partial)
+    else:
+        analyzer = _analyze_files(args.recipes, options)
+    _write_json(analyzer.report(min_tag_recipes=args.min_tag_recipes))
+    print(f"Analyzed {analyzer.recipes} recipes in {time.perf_counter() - started:.1f}s.", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    """Builds the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(prog="mindful-meal-planner",
+                                     description="Non-interactive Mindful Meal Planner commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="validate recipe files into a JSON-lines catalogue")
+    import_parser.add_argument("sources", nargs="+", help="recipe files (JSON array or JSON lines, '-' for stdin)")
+    import_parser.add_argument("-o", "--output", help="catalogue file to write (default: stdout)")
+    import_parser.add_argument("--strict", action="store_true", help="fail on the first invalid recipe")
+    import_parser.set_defaults(handler=cmd_import)
+
+    search_parser = subparsers.add_parser("search", help="search recipes")
+    search_parser.add_argument("--recipes", nargs="+", required=True, help="recipe files ('-' for stdin)")
+    search_parser.add_argument("--cuisine", action="append", help="cuisine to match (repeatable, any of)")
+    search_parser.add_argument("--diet", action="append", help="required dietary tag (repeatable)")
+    search_parser.add_argument("--ingredient", action="append", help="required ingredient (repeatable)")
+    search_parser.add_argument("--exclude-ingredient", action="append", help="excluded ingredient (repeatable)")
+    search_parser.add_argument("--min-cost", type=float, help="minimum recipe cost")
+    search_parser.add_argument("--max-cost", type=float, help="maximum recipe cost")
+    search_parser.add_argument("--max-ingredients", type=int, help="maximum number of ingredients")
+    search_parser.add_argument("--cheapest", action="store_true", help="order results by cost, cheapest first")
+    search_parser.add_argument("--limit", type=int, help="maximum number of results")
+    search_parser.set_defaults(handler=cmd_search)
+
+    plan_parser = subparsers.add_parser("plan", help="generate a weekly meal plan")
+    plan_parser.add_argument("--recipes", nargs="+", required=True, help="recipe files ('-' for stdin)")
+    plan_parser.add_argument("--profile", help="user profile JSON file")
+    plan_parser.add_argument("--seed", type=int, help="random seed for reproducible plans")
+    plan_parser.add_argument("--history", metavar="DIR",
+                             help="plan history directory; recently served recipes are avoided and the plan is recorded")
+    plan_parser.add_argument("--user", default="default", help="user whose plan history is used (default: %(default)s)")
+    plan_parser.set_defaults(handler=cmd_plan)
+
+    shopping_parser = subparsers.add_parser("shopping-list", help="build the shopping list of a saved plan")
+    shopping_parser.add_argument("--recipes", nargs="+", required=True, help="recipe files ('-' for stdin)")
+    shopping_parser.add_argument("--plan", required=True, help="meal plan JSON file written by 'plan'")
+    shopping_parser.add_argument("--profile", help="user profile overriding the one stored in the plan")
+    shopping_parser.set_defaults(handler=cmd_shopping_list)
+
+    export_parser = subparsers.add_parser("export", help="export the recipe catalogue")
+    export_parser.add_argument("--recipes", nargs="+", required=True, help="recipe files ('-' for stdin)")
+    export_parser.add_argument("--format", choices=["json", "jsonl", "csv"], default="json")
+    export_parser.set_defaults(handler=cmd_export)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="write a memory-mappable catalogue snapshot")
+    snapshot_parser.add_argument("--recipes", nargs="+", required=True, help="recipe files ('-' for stdin)")
+    snapshot_parser.add_argument("-o", "--output", required=True, help="snapshot file to write")
+    snapshot_parser.set_defaults(handler=cmd_snapshot)
+
+    analytics_parser = subparsers.add_parser("analytics", help="report catalogue statistics and health checks")
+    analytics_parser.add_argument("--recipes", nargs="+", required=True, help="recipe files ('-' for stdin)")
+    analytics_parser.add_argument("--top", type=int, default=20, help="number of most used ingredients to report")
+    analytics_parser.add_argument("--samples", type=int, default=20,
+                                  help="examples of unparseable quantities to report")
+    analytics_parser.add_argument("--min-tag-recipes", type=int, default=2,
+                                  help="report explicit tags used by fewer recipes as orphans")
+    analytics_parser.add_argument("--workers", type=int, help="analyze recipe files in this many processes")
+    analytics_parser.set_defaults(handler=cmd_analytics)
+
+    return parser
+
+
+def main(argv=None):
+    """Runs a subcommand and returns the process exit status."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except CLIError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Per-user meal plan history with bitsets of recently served recipes.
+
+Each user's plans are appended to `<directory>/<user id>.jsonl`, one line per
+planned week (keyed by the week's Monday). Once the file holds more lines than
+the `max_weeks` weeks that are kept, it is rewritten (through a temporary file
+and a rename) with only the latest plan of each kept week, so it never grows
+beyond max_weeks + 1 lines. Recipes are recorded by their
+normalized name rather than by recipe id, because ids are assigned in load order
+and point at other recipes once the catalogue is reloaded or reordered. The
+planner maps the recently served names onto the ids of the current catalogue and
+keeps them as an integer bitset with bit `recipe_id` set for each recipe, so it
+removes them from its candidates with one `candidates & ~recent`.
+"""
+import datetime
+import json
+import os
+from urllib.parse import quote
+
+
+def week_start(date=None):
+    """Returns the Monday of the week containing `date` (default: today)."""
+    date = date or datetime.date.today()
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def recipe_key(name):
+    """Returns the normalized name under which a recipe is recorded."""
+    return name.lower()
+
+
+def ids_to_mask(recipe_ids):
+    """Returns a bitset with the bits of the given recipe ids set."""
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return 0
+    bits = bytearray(max(recipe_ids) // 8 + 1)
+    for recipe_id in recipe_ids:
+        bits[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def mask_to_ids(mask):
+    """Returns the recipe ids whose bits are set in a bitset, in increasing order."""
+    recipe_ids = []
+    for index, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, "little")):
+        while byte:
+            low_bit = byte & -byte
+            recipe_ids.append(index * 8 + low_bit.bit_length() - 1)
+            byte ^= low_bit
+    return recipe_ids
+
+
+class PlanHistory:
+    """Stores the weekly meal plans of each user and answers "recently served" queries."""
+
+    def __init__(self, directory, max_weeks=12):
+        """Initializes a PlanHistory in `directory`, keeping the latest `max_weeks` weeks per user.
+
+        The directory is created when the first plan is recorded.
+        """
+        self.directory = directory
+        self.max_weeks = max_weeks
+        self._weeks = {}  # user id -> {week start: frozenset of recipe keys}
+        self._line_counts = {}  # user id -> lines in the user's file
+
+    def _path(self, user_id):
+        return os.path.join(self.directory, f"{quote(str(user_id), safe='')}.jsonl")
+
+    def _load(self, user_id):
+        weeks = self._weeks.get(user_id)
+        if weeks is not None:
+            return weeks
+        weeks = {}
+        line_count = 0
+        try:
+            with open(self._path(user_id), encoding="utf-8") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    line_count += 1
+                    try:
+                        entry = json.loads(line)
+                        weeks[datetime.date.fromisoformat(entry["week"])] = frozenset(entry["recipes"])
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        print(f"Warning: Skipping malformed plan history entry for user '{user_id}'.")
+        except FileNotFoundError:
+            pass
+        self._weeks[user_id] = weeks
+        self._line_counts[user_id] = line_count
+        self._trim(weeks)
+        return weeks
+
+    def _trim(self, weeks):
+        for week in sorted(weeks)[:-self.max_weeks]:
+            del weeks[week]
+
+    def record_plan(self, user_id, meal_plan, week=None):
+        """Records the recipes of a meal plan as served in `week` (a date; default: this week).
+
+        Recording a week again replaces its earlier plan.
+        """
+        week = week_start(week)
+        slots = {day: {meal_type: recipe_key(recipe.name) if recipe else None for meal_type, recipe in meals.items()}
+                 for day, meals in meal_plan.meals.items()}
+        recipes = sorted({key for meals in slots.values() for key in meals.values() if key is not None})
+        weeks = self._load(user_id)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(user_id), "a", encoding="utf-8") as file:
+            file.write(json.dumps({"week": week.isoformat(), "recipes": recipes, "meals": slots}) + "\n")
+        self._line_counts[user_id] += 1
+        weeks[week] = frozenset(recipes)
+        self._trim(weeks)
+        if self._line_counts[user_id] > self.max_weeks:
+            self._compact(user_id)
+
+    def _compact(self, user_id):
+        """Rewrites a user's file with the latest entry of each week kept in memory."""
+        path = self._path(user_id)
+        kept = self._weeks[user_id]
+        lines = {}
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    week = datetime.date.fromisoformat(json.loads(line)["week"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if week in kept:
+                    lines[week] = line if line.endswith("\n") else line + "\n"
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.writelines(lines[week] for week in sorted(lines))
+        os.replace(temp_path, path)
+        self._line_counts[user_id] = len(lines)
+
+    def recent_recipes(self, user_id, weeks=4, before=None):
+        """Returns the keys of recipes served in the `weeks` weeks before the week of `before`."""
+        end = week_start(before)
+        start = end - datetime.timedelta(weeks=weeks)
+        recent = set()
+        for week, recipes in self._load(user_id).items():
+            if start <= week < end:
+                recent |= recipes
+        return recent
+
+    def recent_mask(self, user_id, recipe_database, weeks=4, before=None):
+        """Returns the bitset of the ids in `recipe_database` of recipes served in the `weeks` weeks before `before`."""
+        return ids_to_mask(recipe_id for key in self.recent_recipes(user_id, weeks, before)
+                           for recipe_id in recipe_database.recipe_ids_named(key))
@@ -0,0 +1,308 @@
+"""Concurrent ingestion of recipes from HTTP recipe sources.
+
+A RecipeIngester crawls pluggable RecipeSource objects with a fixed number of
+asyncio worker tasks. Each request runs on a pooled keep-alive connection from
+a ConnectionPool, is retried with exponential backoff on connection errors and
+retryable statuses, and is made conditional with If-None-Match when the page's
+ETag is known, so unchanged pages cost a 304 and no parsing. Parsed records
+stream into the RecipeDatabase as each page arrives: new names are added and
+known names are updated in place.
+
+The HTTP client uses the standard library (http.client) so that ingestion has
+no third-party dependencies; any server reachable over http or https works,
+including a local http.server stand-in:
+
+    ingester = RecipeIngester(recipe_database, concurrency=8)
+    report = ingester.run([JSONFeedSource("partner", "http://127.0.0.1:8000/recipes")])
+"""
+import asyncio
+import http.client
+import json
+import random
+import threading
+from urllib.parse import urljoin, urlsplit
+
+from main import Recipe
+
+
+class IngestionError(Exception):
+    """Raised when a page cannot be fetched after all retries."""
+
+
+class HTTPResponse:
+    """A fully read HTTP response."""
+
+    def __init__(self, status, headers, body):
+        """Initializes an HTTPResponse; header names are lower-cased."""
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """Decodes the body as JSON."""
+        return json.loads(self.body.decode("utf-8"))
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections, keyed by scheme, host and port."""
+
+    def __init__(self, max_idle_per_host=10, timeout=10.0, user_agent="mindful-meal-planner"):
+        """Initializes a ConnectionPool keeping up to `max_idle_per_host` idle connections per host."""
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.connections_opened += 1
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self.timeout), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, method, url, headers=None):
+        """Performs a blocking request and returns an HTTPResponse."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme in '{url}'.")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        request_headers = {"User-Agent": self.user_agent, "Accept": "application/json", **(headers or {})}
+
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request(method, target, headers=request_headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    continue  # The server closed an idle keep-alive connection; retry on a fresh one.
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            return HTTPResponse(response.status, {name.lower(): value for name, value in response.getheaders()}, body)
+
+    def close(self):
+        """Closes all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for transient failures."""
+
+    def __init__(self, max_attempts=4, backoff=0.5, max_backoff=10.0, retry_statuses=(429, 500, 502, 503, 504)):
+        """Initializes a RetryPolicy making at most `max_attempts` attempts per request."""
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be positive.")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+
+    def delay(self, attempt, response=None):
+        """Returns the seconds to wait before retry number `attempt` (1-based)."""
+        if response is not None and "retry-after" in response.headers:
+            try:
+                return min(float(response.headers["retry-after"]), self.max_backoff)
+            except ValueError:
+                pass
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff) * random.uniform(0.5, 1.0)
+
+
+class RecipeSource:
+    """Base class for recipe sources. Subclasses override start_urls and parse_page."""
+
+    name = "source"
+
+    def start_urls(self):
+        """Returns the URLs of the first pages to fetch."""
+        raise NotImplementedError
+
+    def parse_page(self, url, response):
+        """Returns (recipe dictionaries, URLs of further pages) for a fetched page."""
+        raise NotImplementedError
+
+    def to_recipe_dict(self, record):
+        """Maps a source record to the dictionary accepted by Recipe.from_dict."""
+        return record
+
+
+class JSONFeedSource(RecipeSource):
+    """A JSON feed whose pages look like {"recipes": [...], "next": "<url of next page>"}.
+
+    `page_urls` may list extra pages to fetch concurrently when the feed exposes them
+    up front; `field_map` renames source fields to Recipe fields.
+    """
+
+    def __init__(self, name, url, records_key="recipes", next_key="next", page_urls=None, field_map=None):
+        """Initializes a JSONFeedSource starting at `url`."""
+        self.name = name
+        self.url = url
+        self.records_key = records_key
+        self.next_key = next_key
+        self.page_urls = list(page_urls or [])
+        self.field_map = dict(field_map or {})
+
+    def start_urls(self):
+        return [self.url] + self.page_urls
+
+    def parse_page(self, url, response):
+        payload = response.json()
+        if isinstance(payload, list):
+            return payload, []
+        records = payload.get(self.records_key) or []
+        next_url = payload.get(self.next_key) if self.next_key else None
+        return records, [urljoin(url, next_url)] if next_url else []
+
+    def to_recipe_dict(self, record):
+        if not self.field_map:
+            return record
+        return {self.field_map.get(field, field): value for field, value in record.items()}
+
+
+class IngestReport:
+    """Counters describing one ingestion run."""
+
+    def __init__(self):
+        """Initializes an empty IngestReport."""
+        self.pages_fetched = 0
+        self.pages_not_modified = 0
+        self.recipes_added = 0
+        self.recipes_updated = 0
+        self.recipes_skipped = 0
+        self.errors = []  # (url, message)
+
+    def to_dict(self):
+        """Returns the counters as a dictionary."""
+        return dict(vars(self))
+
+
+class RecipeIngester:
+    """Fetches recipe sources concurrently and streams their recipes into a RecipeDatabase."""
+
+    def __init__(self, recipe_database, pool=None, concurrency=8, retry_policy=None, etag_cache=None):
+        """Initializes a RecipeIngester.
+
+        `etag_cache` is a JSON-serializable dictionary {url: {"etag": ..., "next": [...]}};
+        pass the same dictionary on the next run to make requests conditional.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive.")
+        self.recipe_database = recipe_database
+        self.pool = pool if pool is not None else ConnectionPool(max_idle_per_host=concurrency)
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.etag_cache = etag_cache if etag_cache is not None else {}
+
+    def run(self, sources):
+        """Ingests the given sources and returns an IngestReport."""
+        return asyncio.run(self.ingest(sources))
+
+    async def ingest(self, sources):
+        """Ingests the given sources from within a running event loop and returns an IngestReport."""
+        report = IngestReport()
+        queue = asyncio.Queue()
+        seen = set()
+        for source in sources:
+            for url in source.start_urls():
+                if url not in seen:
+                    seen.add(url)
+                    queue.put_nowait((source, url))
+
+        async def worker():
+            while True:
+                source, url = await queue.get()
+                try:
+                    for next_url in await self._process_page(source, url, report):
+                        if next_url not in seen:
+                            seen.add(next_url)
+                            queue.put_nowait((source, next_url))
+                except Exception as e:
+                    report.errors.append((url, str(e)))
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return report
+
+    async def _process_page(self, source, url, report):
+        cached = self.etag_cache.get(url)
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        response = await self._fetch(url, headers)
+        if response.status == 304 and cached:
+            report.pages_not_modified += 1
+            return cached.get("next", [])
+        if response.status != 200:
+            raise IngestionError(f"HTTP {response.status}")
+
+        report.pages_fetched += 1
+        records, next_urls = source.parse_page(url, response)
+        for record in records:
+            self._import_record(source, record, report)
+        if "etag" in response.headers:
+            self.etag_cache[url] = {"etag": response.headers["etag"], "next": list(next_urls)}
+        return next_urls
+
+    async def _fetch(self, url, headers):
+        policy = self.retry_policy
+        for attempt in range(1, policy.max_attempts + 1):
+            try:
+                response = await asyncio.to_thread(self.pool.request, "GET", url, headers)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt == policy.max_attempts:
+                    raise IngestionError(f"Request failed after {attempt} attempts: {e}")
+                await asyncio.sleep(policy.delay(attempt))
+                continue
+            if response.status in policy.retry_statuses and attempt < policy.max_attempts:
+                await asyncio.sleep(policy.delay(attempt, response))
+                continue
+            return response
+
+    def _import_record(self, source, record, report):
+        try:
+            recipe = Recipe.from_dict(source.to_recipe_dict(record))
+        except (TypeError, ValueError) as e:
+            report.recipes_skipped += 1
+            print(f"Warning: Skipping invalid recipe from {source.name}: {e}")
+            return
+        existing = self.recipe_database.get_recipe_by_name(recipe.name)
+        if existing is None:
+            self.recipe_database.add_recipe(recipe)
+            report.recipes_added += 1
+            return
+        changes = {field: value for field, value in recipe.to_dict().items() if getattr(existing, field) != value}
+        if changes:
+            self.recipe_database.update_recipe(existing.recipe_id, **changes)
+            report.recipes_updated += 1
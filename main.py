@@ -1,5 +1,16 @@
 import random
 import datetime
+from bisect import bisect_left, insort
+import hashlib
+import json
+import sys
+
+from history import PlanHistory, ids_to_mask, mask_to_ids
+from query import And, Cuisine, HasIngredient, HasTag, QueryPlanner
+from similarity import LSHIndex, MinHasher, jaccard_similarity
+import taxonomy
+
+HISTORY_DIRECTORY = "plan_history"  # Where the interactive menu records the generated plans
 
 class UserProfile:
     """Represents a user's profile with dietary restrictions, preferences, and budget."""
@@ -22,6 +33,41 @@ class UserProfile:
         if food_on_hand is not None:
             self.food_on_hand = food_on_hand
 
+    def to_dict(self):
+        """Returns a JSON-serializable representation of the profile."""
+        return {
+            "dietary_restrictions": list(self.dietary_restrictions),
+            "preferred_cuisines": list(self.preferred_cuisines),
+            "budget": self.budget,
+            "food_on_hand": dict(self.food_on_hand),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a UserProfile from a dictionary such as the one returned by to_dict."""
+        if not isinstance(data, dict):
+            raise TypeError("Profile data must be a dictionary.")
+        for key in ("dietary_restrictions", "preferred_cuisines"):
+            if not isinstance(data.get(key) or [], list):
+                raise TypeError(f"Profile {key} must be a list.")
+        if not isinstance(data.get("food_on_hand") or {}, dict):
+            raise TypeError("Profile food_on_hand must be a dictionary.")
+        budget = data.get("budget")
+        food_on_hand = {ingredient: float(quantity) for ingredient, quantity in (data.get("food_on_hand") or {}).items()}
+        return cls(data.get("dietary_restrictions"), data.get("preferred_cuisines"),
+                   float(budget) if budget is not None else None, food_on_hand)
+
+    def fingerprint(self):
+        """Returns a content hash of the normalized profile; equal criteria give equal fingerprints."""
+        normalized = {
+            "dietary_restrictions": sorted({restriction.strip().lower() for restriction in self.dietary_restrictions}),
+            "preferred_cuisines": sorted({cuisine.strip().lower() for cuisine in self.preferred_cuisines}),
+            "budget": round(float(self.budget), 2) if self.budget is not None else None,
+            "food_on_hand": sorted((ingredient.strip().lower(), round(float(quantity), 3))
+                                   for ingredient, quantity in self.food_on_hand.items()),
+        }
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
     def __str__(self):
         return (f"Dietary Restrictions: {', '.join(self.dietary_restrictions) or 'None'}\n"
                 f"Preferred Cuisines: {', '.join(self.preferred_cuisines) or 'None'}\n"
@@ -38,6 +84,8 @@ class Recipe:
             raise TypeError("Ingredients must be a dictionary.")
         if not isinstance(instructions, list):
             raise TypeError("Instructions must be a list.")
+        if dietary_info is not None and not isinstance(dietary_info, list):
+            raise TypeError("Dietary info must be a list.")
         if not name:
             raise ValueError("Recipe name cannot be empty.")
         if not ingredients:
@@ -53,10 +101,62 @@ class Recipe:
         self.cuisine = cuisine
         self.dietary_info = dietary_info if dietary_info is not None else []
         self.cost = cost
+        self.recipe_id = None  # Assigned by RecipeDatabase.add_recipe
+        self.ingredient_mask = None  # Taxonomy categories of the ingredients, derived by RecipeDatabase
 
     def __str__(self):
         return f"{self.name} ({self.cuisine})"
 
+    def to_dict(self):
+        """Returns a JSON-serializable representation of the recipe."""
+        return {
+            "name": self.name,
+            "ingredients": dict(self.ingredients),
+            "instructions": list(self.instructions),
+            "cuisine": self.cuisine,
+            "dietary_info": list(self.dietary_info),
+            "cost": self.cost,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a Recipe from a dictionary such as the one returned by to_dict."""
+        if not isinstance(data, dict):
+            raise TypeError("Recipe data must be a dictionary.")
+        cost = data.get("cost")
+        return cls(data.get("name"), data.get("ingredients"), data.get("instructions"), data.get("cuisine"),
+                   data.get("dietary_info"), float(cost) if cost is not None else None)
+
+    def dietary_tags(self):
+        """Returns the lower-case dietary tags of the recipe, explicit and inferred from its ingredients.
+
+        Explicit tags contradicted by a recognised ingredient (a "vegan" recipe with chicken) are dropped.
+        """
+        mask = self._mask()
+        tags = {tag.lower() for tag in self.dietary_info if not taxonomy.contradicts(mask, tag)}
+        tags.update(taxonomy.dietary_labels(mask))
+        return tags
+
+    def has_dietary_tag(self, tag):
+        """Returns True if the recipe carries a dietary tag, explicitly or by inference from its ingredients."""
+        mask = self._mask()
+        if taxonomy.satisfies(mask, tag):
+            return True
+        if taxonomy.contradicts(mask, tag):
+            return False
+        tag = tag.strip().lower()
+        return any(item.lower() == tag for item in self.dietary_info)
+
+    def allergens(self):
+        """Returns the allergen categories found in the ingredients (see taxonomy.py)."""
+        return taxonomy.allergen_names(self._mask())
+
+    def _mask(self):
+        """Returns the taxonomy bitmask of the ingredients, as derived by RecipeDatabase or computed now."""
+        if self.ingredient_mask is not None:
+            return self.ingredient_mask
+        return taxonomy.recipe_mask(ingredient.strip().lower() for ingredient in self.ingredients)
+
     def display_recipe(self):
         """Displays the full recipe details."""
         print(f"\n--- {self.name} ---")
@@ -69,6 +169,9 @@ class Recipe:
             print(f"{i + 1}. {step}")
         if self.dietary_info:
             print(f"\nDietary Info: {', '.join(self.dietary_info)}")
+        allergens = self.allergens()
+        if allergens:
+            print(f"Contains: {', '.join(allergens)}")
         if self.cost:
             print(f"Estimated Cost: ${self.cost:.2f}")
 
@@ -148,6 +251,31 @@ class MealPlan:
                     total_cost += recipe.cost
         return round(total_cost, 2)
 
+    def to_dict(self):
+        """Returns a JSON-serializable representation of the plan, referencing recipes by name."""
+        return {
+            "profile": self.user_profile.to_dict(),
+            "meals": {day: {meal_type: recipe.name if recipe else None for meal_type, recipe in meals.items()}
+                      for day, meals in self.meals.items()},
+            "total_cost": self.calculate_total_cost(),
+        }
+
+    @classmethod
+    def from_dict(cls, data, recipe_database):
+        """Creates a MealPlan from a dictionary, resolving recipe names in `recipe_database`."""
+        if not isinstance(data, dict):
+            raise TypeError("Meal plan data must be a dictionary.")
+        meal_plan = cls(UserProfile.from_dict(data.get("profile") or {}))
+        for day, meals in (data.get("meals") or {}).items():
+            for meal_type, recipe_name in meals.items():
+                if recipe_name is None:
+                    continue
+                recipe = recipe_database.get_recipe_by_name(recipe_name)
+                if recipe is None:
+                    raise ValueError(f"Recipe '{recipe_name}' not found in the database.")
+                meal_plan.add_recipe(day, meal_type, recipe)
+        return meal_plan
+
     def __str__(self):
         """Returns a string representation of the meal plan."""
         plan_string = ""
@@ -172,60 +300,262 @@ class MealPlan:
 
 
 class RecipeDatabase:
-    """Manages a collection of recipes."""
-
-    def __init__(self):
-        """Initializes a RecipeDatabase object."""
+    """Manages a collection of recipes.
+
+    `recipes` lists the recipes in the order they were added until one is removed:
+    removal moves the last recipe into the freed position, so the list (and
+    get_recipe_by_index) is not in insertion order afterwards. Queries return
+    recipes in recipe id order, which is always the order they were added.
+    """
+
+    def __init__(self, num_perm=64, lsh_bands=None, lsh_threshold=0.3):
+        """Initializes a RecipeDatabase object.
+
+        Similar-recipe lookups score the recipes whose MinHash signatures share an LSH
+        band with the query. The bands are derived from `lsh_threshold`, which should
+        be close to the min_similarity used with find_similar_recipes(), unless
+        `lsh_bands` is given.
+        """
         self.recipes = []
+        self.version = 0  # Bumped on every mutation of the catalogue
+        self._recipes_by_id = {}
+        self._positions = {}  # Recipe id -> index in self.recipes
+        self._recipes_by_name = {}  # Lower-case name -> {recipe id: recipe}
+        self._ingredient_index = {}
+        self._cuisine_index = {}
+        self._tag_index = {}
+        self._size_index = {}  # Number of ingredients -> recipe ids
+        self._cost_index = []  # Sorted (cost, recipe id) pairs of recipes with a cost
+        self._next_id = 0
+        self.change_log = None  # Optional ChangeLog recording every mutation (see changelog.py)
+        self._minhasher = MinHasher(num_perm)
+        self._lsh_index = LSHIndex(num_perm, lsh_bands, lsh_threshold)
+        self._signatures = {}
 
     def add_recipe(self, recipe):
         """Adds a recipe to the database."""
         if not isinstance(recipe, Recipe):
             raise TypeError("recipe must be a Recipe object.")
+        self._insert_recipe(recipe, self._next_id)
+        self._record_change("add", recipe.recipe_id, recipe.to_dict())
+
+    def _insert_recipe(self, recipe, recipe_id):
+        """Stores and indexes a recipe under the given id."""
+        if recipe_id in self._recipes_by_id:
+            raise ValueError(f"Recipe id {recipe_id} is already in use.")
+        recipe.recipe_id = recipe_id
+        self._next_id = max(self._next_id, recipe_id + 1)
+        self._positions[recipe_id] = len(self.recipes)
         self.recipes.append(recipe)
+        self._recipes_by_id[recipe_id] = recipe
+        self._index_recipe(recipe)
+        self.version += 1
+
+    def remove_recipe(self, recipe_id):
+        """Removes a recipe from the database and returns it.
+
+        The last recipe of self.recipes moves into the removed recipe's position.
+        """
+        recipe = self._recipes_by_id.get(recipe_id)
+        if recipe is None:
+            raise ValueError(f"No recipe with id {recipe_id}.")
+        self._unindex_recipe(recipe)
+        del self._recipes_by_id[recipe_id]
+        position = self._positions.pop(recipe_id)
+        last = self.recipes.pop()
+        if last is not recipe:
+            self.recipes[position] = last
+            self._positions[last.recipe_id] = position
+        self.version += 1
+        self._record_change("delete", recipe_id, None)
+        return recipe
+
+    def _record_change(self, operation, recipe_id, data):
+        """Appends a mutation to the change log, if one is attached."""
+        if self.change_log is not None:
+            self.change_log.append(operation, recipe_id, data)
+
+    def apply_change(self, change):
+        """Applies a change event read from a change log (see changelog.py) without logging it again."""
+        operation, recipe_id, data = change["op"], change["recipe_id"], change.get("data")
+        change_log, self.change_log = self.change_log, None
+        try:
+            if operation == "add":
+                self._insert_recipe(Recipe.from_dict(data), recipe_id)
+            elif operation == "update":
+                self.update_recipe(recipe_id, **data)
+            elif operation == "delete":
+                self.remove_recipe(recipe_id)
+            else:
+                raise ValueError(f"Unknown change operation '{operation}'.")
+        finally:
+            self.change_log = change_log
+
+    def update_recipe(self, recipe_id, **changes):
+        """Updates fields of a stored recipe and refreshes the indexes that depend on them."""
+        recipe = self._recipes_by_id.get(recipe_id)
+        if recipe is None:
+            raise ValueError(f"No recipe with id {recipe_id}.")
+        unknown = set(changes) - {"name", "ingredients", "instructions", "cuisine", "dietary_info", "cost"}
+        if unknown:
+            raise ValueError(f"Unknown recipe fields: {', '.join(sorted(unknown))}.")
+        updated = Recipe.from_dict({**recipe.to_dict(), **changes})  # Validates and normalizes the fields
+
+        reindex = "name" in changes or "ingredients" in changes
+        if reindex:
+            self._unindex_recipe(recipe)
+        else:
+            self._unindex_attributes(recipe)
+        for field in changes:
+            setattr(recipe, field, getattr(updated, field))
+        if reindex:
+            self._index_recipe(recipe)
+        else:
+            self._index_attributes(recipe)
+        self.version += 1
+        self._record_change("update", recipe_id, {field: getattr(recipe, field) for field in changes})
+        return recipe
+
+    def _index_recipe(self, recipe):
+        """Adds a recipe to every index."""
+        self._recipes_by_name.setdefault(recipe.name.lower(), {})[recipe.recipe_id] = recipe
+        ingredients = self._ingredient_set(recipe)
+        for ingredient in ingredients:
+            self._ingredient_index.setdefault(ingredient, set()).add(recipe.recipe_id)
+        self._size_index.setdefault(len(recipe.ingredients), set()).add(recipe.recipe_id)
+        recipe.ingredient_mask = taxonomy.recipe_mask(ingredients)
+        self._index_attributes(recipe)
+        signature = self._minhasher.signature(ingredients)
+        self._signatures[recipe.recipe_id] = signature
+        self._lsh_index.insert(recipe.recipe_id, signature)
+
+    def _unindex_recipe(self, recipe):
+        """Removes a recipe from every index."""
+        name = recipe.name.lower()
+        same_name = self._recipes_by_name.get(name)
+        if same_name is not None:
+            same_name.pop(recipe.recipe_id, None)
+            if not same_name:
+                del self._recipes_by_name[name]
+        for ingredient in self._ingredient_set(recipe):
+            self._discard_from_index(self._ingredient_index, ingredient, recipe.recipe_id)
+        self._discard_from_index(self._size_index, len(recipe.ingredients), recipe.recipe_id)
+        self._unindex_attributes(recipe)
+        self._signatures.pop(recipe.recipe_id, None)
+        self._lsh_index.remove(recipe.recipe_id)
+
+    def _index_attributes(self, recipe):
+        """Adds a recipe to the cuisine, tag and cost indexes."""
+        self._cuisine_index.setdefault(recipe.cuisine.lower(), set()).add(recipe.recipe_id)
+        for tag in recipe.dietary_tags():
+            self._tag_index.setdefault(tag, set()).add(recipe.recipe_id)
+        if recipe.cost is not None:
+            insort(self._cost_index, (recipe.cost, recipe.recipe_id))
+
+    def _unindex_attributes(self, recipe):
+        """Removes a recipe from the cuisine, tag and cost indexes."""
+        self._discard_from_index(self._cuisine_index, recipe.cuisine.lower(), recipe.recipe_id)
+        for tag in recipe.dietary_tags():
+            self._discard_from_index(self._tag_index, tag, recipe.recipe_id)
+        if recipe.cost is not None:
+            position = bisect_left(self._cost_index, (recipe.cost, recipe.recipe_id))
+            if position < len(self._cost_index) and self._cost_index[position] == (recipe.cost, recipe.recipe_id):
+                del self._cost_index[position]
+
+    @staticmethod
+    def _discard_from_index(index, key, recipe_id):
+        """Removes a recipe id from an inverted index entry, dropping the entry when it becomes empty."""
+        recipe_ids = index.get(key)
+        if recipe_ids is not None:
+            recipe_ids.discard(recipe_id)
+            if not recipe_ids:
+                del index[key]
+
+    def recipes_with_ingredient(self, ingredient):
+        """Returns the set of ids of the recipes that use an ingredient."""
+        return set(self._ingredient_index.get(ingredient.strip().lower(), ()))
+
+    @staticmethod
+    def _ingredient_set(recipe):
+        """Returns the normalized set of ingredient names of a recipe."""
+        return {ingredient.strip().lower() for ingredient in recipe.ingredients}
+
+    def find_similar_recipes(self, recipe, k=5, min_similarity=0.3, dietary_restrictions=None, max_cost=None):
+        """Returns up to `k` (recipe, similarity) pairs sharing ingredients with `recipe`.
+
+        Candidates come from the LSH buckets of the recipe's MinHash signature, so only
+        recipes likely to reach `min_similarity` are scored. Results honour the given
+        dietary restrictions and maximum cost, and are sorted by decreasing similarity.
+        """
+        if not isinstance(recipe, Recipe):
+            raise TypeError("recipe must be a Recipe object.")
+        if k <= 0:
+            return []
+
+        ingredients = self._ingredient_set(recipe)
+        if self._recipes_by_id.get(recipe.recipe_id) is recipe:
+            signature = self._signatures[recipe.recipe_id]
+        else:
+            signature = self._minhasher.signature(ingredients)
+        required = [restriction.lower() for restriction in dietary_restrictions or []]
+
+        scored = []
+        for candidate_id in self._lsh_index.query(signature):
+            candidate = self._recipes_by_id[candidate_id]
+            if candidate is recipe:
+                continue
+            if max_cost is not None and (candidate.cost or 0) > max_cost:
+                continue
+            if required and not all(candidate.has_dietary_tag(restriction) for restriction in required):
+                continue
+            similarity = jaccard_similarity(ingredients, self._ingredient_set(candidate))
+            if similarity >= min_similarity:
+                scored.append((similarity, candidate_id, candidate))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(candidate, round(similarity, 3)) for similarity, _, candidate in scored[:k]]
 
     def search_recipes(self, criteria=None):
-        """Searches for recipes based on specified criteria."""
+        """Searches for recipes based on specified criteria.
+
+        Matches are in recipe id order; without criteria, all recipes are returned in list order.
+        """
         if criteria is None:
             return self.recipes
 
         if not isinstance(criteria, dict):
             raise TypeError("criteria must be a dictionary.")
 
-        matching_recipes = []
-        for recipe in self.recipes:
-            match = True
-            for key, value in criteria.items():
-                key = key.lower()
-                if key == "cuisine":
-                    if recipe.cuisine.lower() != value.lower():
-                        match = False
-                        break
-                elif key == "dietary_info":
-                    if not isinstance(value, list):
-                        value = [value]
-                    for req in value:
-                        if req.lower() not in [item.lower() for item in recipe.dietary_info]:
-                            match = False
-                            break
-                    if not match:
-                        break
-                elif key == "ingredients":
-                    if not isinstance(value, list):
-                        raise TypeError("Ingredients criteria must be a list.")
-                    for ingredient in value:
-                        if ingredient.lower() not in [item.lower() for item in recipe.ingredients.keys()]:
-                            match = False
-                            break
-                    if not match:
-                        break
-                else:
-                    print(f"Warning: Unknown search criteria '{key}'.  Skipping.")
+        terms = []
+        for key, value in criteria.items():
+            key = key.lower()
+            if key == "cuisine":
+                cuisines = value if isinstance(value, list) else [value]
+                if not cuisines:
+                    return []
+                terms.append(Cuisine(*cuisines))
+            elif key == "dietary_info":
+                if not isinstance(value, list):
+                    value = [value]
+                terms.extend(HasTag(tag) for tag in value)
+            elif key == "ingredients":
+                if not isinstance(value, list):
+                    raise TypeError("Ingredients criteria must be a list.")
+                terms.extend(HasIngredient(ingredient) for ingredient in value)
+            else:
+                print(f"Warning: Unknown search criteria '{key}'.  Skipping.")
+
+        if not terms:
+            return list(self.recipes)
+        return self.query(And(*terms))
 
-            if match:
-                matching_recipes.append(recipe)
+    def query(self, expression, limit=None, order_by_cost=False):
+        """Returns the recipes matching a query expression (see query.py).
 
-        return matching_recipes
+        Results are in recipe id order, or cheapest first with order_by_cost; `limit`
+        stops the search once enough recipes have been found.
+        """
+        return QueryPlanner(self).execute(expression, limit=limit, order_by_cost=order_by_cost)
 
     def display_all_recipes(self):
         """Displays a list of all recipes in the database."""
@@ -238,11 +568,17 @@ class RecipeDatabase:
             print(f"{i+1}. {recipe}")
 
     def get_recipe_by_name(self, name):
-        """Returns a recipe object given its name."""
-        for recipe in self.recipes:
-            if recipe.name.lower() == name.lower():
-                return recipe
-        return None
+        """Returns a recipe object given its name (the earliest added one if several share it)."""
+        recipes = self._recipes_by_name.get(name.lower())
+        return recipes[min(recipes)] if recipes else None
+
+    def recipe_ids_named(self, name):
+        """Returns the ids of the recipes with the given name."""
+        return list(self._recipes_by_name.get(name.lower(), ()))
+
+    def get_recipe_by_id(self, recipe_id):
+        """Returns a recipe object given the id assigned when it was added."""
+        return self._recipes_by_id.get(recipe_id)
 
     def get_recipe_by_index(self, index):
         """Returns a recipe object given its index in the list."""
@@ -255,11 +591,24 @@ class RecipeDatabase:
 class MindfulMealPlanner:
     """Main application class for the Mindful Meal Planner."""
 
-    def __init__(self):
-        """Initializes the MindfulMealPlanner application."""
+    def __init__(self, plan_cache=None, plan_history=None, user_id="default", repeat_window_weeks=4,
+                 repeat_weight=0.0):
+        """Initializes the MindfulMealPlanner application.
+
+        If a PlanCache is given, seeded plan requests are answered from it when the
+        profile and the catalogue version are unchanged. If a PlanHistory is given,
+        generated plans are recorded for `user_id` and recipes served in the last
+        `repeat_window_weeks` weeks are avoided: excluded while fresh recipes remain
+        (repeat_weight=0), or chosen with relative weight `repeat_weight`.
+        """
         self.user_profile = UserProfile()
         self.recipe_database = RecipeDatabase()
         self.meal_plan = MealPlan(self.user_profile)
+        self.plan_cache = plan_cache
+        self.plan_history = plan_history
+        self.user_id = user_id
+        self.repeat_window_weeks = repeat_window_weeks
+        self.repeat_weight = repeat_weight
 
     def create_sample_recipes(self):
         """Creates and adds some sample recipes to the recipe database."""
@@ -313,8 +662,32 @@ class MindfulMealPlanner:
         self.user_profile.update_profile(dietary_restrictions, preferred_cuisines, budget, food_on_hand)
         self.meal_plan = MealPlan(self.user_profile)
 
-    def generate_meal_plan(self):
-        """Generates a meal plan based on the user's profile and the available recipes."""
+    def generate_meal_plan(self, seed=None, week=None):
+        """Generates a meal plan based on the user's profile and the available recipes.
+
+        The same seed, profile, catalogue version and recent history always produce the
+        same plan, so seeded requests are served from the plan cache when one is
+        configured. `week` is the date of the planned week (default: this week).
+        """
+        recent_mask = 0
+        if self.plan_history is not None:
+            recent_mask = self.plan_history.recent_mask(self.user_id, self.recipe_database,
+                                                        self.repeat_window_weeks, week)
+
+        cache_key = None
+        if seed is not None and self.plan_cache is not None:
+            history_digest = hashlib.sha256(recent_mask.to_bytes((recent_mask.bit_length() + 7) // 8, "little"))
+            cache_key = self.plan_cache.make_key(self.user_profile.fingerprint(), self.recipe_database.version, seed,
+                                                 [history_digest.hexdigest(), self.repeat_weight])
+            slots = self.plan_cache.get(cache_key)
+            if slots is not None:
+                meal_plan = self._meal_plan_from_slots(slots)
+                if meal_plan is not None:
+                    self.meal_plan = meal_plan
+                    self._record_meal_plan(week)
+                    return
+
+        rng = random.Random(seed) if seed is not None else random
         search_criteria = {}
         if self.user_profile.dietary_restrictions:
             search_criteria["dietary_info"] = self.user_profile.dietary_restrictions
@@ -330,6 +703,7 @@ class MindfulMealPlanner:
 
         days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
         meal_types = ["Breakfast", "Lunch", "Dinner"]
+        available_recipes, weights = self._avoid_recent_repeats(available_recipes, recent_mask)
 
         for day in days:
             for meal_type in meal_types:
@@ -339,12 +713,74 @@ class MindfulMealPlanner:
                     self.meal_plan.add_recipe(day, meal_type, None) # Set to None if no recipe is found
                     continue
 
-                recipe = random.choice(suitable_recipes)
+                recipe = rng.choices(suitable_recipes, weights)[0] if weights else rng.choice(suitable_recipes)
                 try:
                     self.meal_plan.add_recipe(day, meal_type, recipe)
                 except ValueError as e:
                     print(f"Error adding recipe: {e}")
 
+        if cache_key is not None:
+            self.plan_cache.put(cache_key, self._meal_plan_slots(self.meal_plan))
+        self._record_meal_plan(week)
+
+    def _avoid_recent_repeats(self, recipes, recent_mask):
+        """Returns (recipes, weights) for drawing meals, given the bitset of recently served recipes.
+
+        Repeats are removed with a single mask operation while fresh recipes remain, or
+        kept with weight repeat_weight when it is positive; weights is None for a uniform draw.
+        """
+        if not recent_mask:
+            return recipes, None
+        candidate_mask = ids_to_mask(recipe.recipe_id for recipe in recipes)
+        fresh_mask = candidate_mask & ~recent_mask
+        if fresh_mask == candidate_mask:
+            return recipes, None
+        if self.repeat_weight > 0:
+            fresh_ids = set(mask_to_ids(fresh_mask))
+            return recipes, [1.0 if recipe.recipe_id in fresh_ids else self.repeat_weight for recipe in recipes]
+        if not fresh_mask:
+            return recipes, None  # Everything was served recently; repeats are unavoidable
+        return [self.recipe_database.get_recipe_by_id(recipe_id) for recipe_id in mask_to_ids(fresh_mask)], None
+
+    def _record_meal_plan(self, week):
+        """Records the current meal plan in the plan history, if one is configured."""
+        if self.plan_history is not None:
+            self.plan_history.record_plan(self.user_id, self.meal_plan, week)
+
+    @staticmethod
+    def _meal_plan_slots(meal_plan):
+        """Returns {day: {meal type: recipe id}} for a meal plan."""
+        return {day: {meal_type: recipe.recipe_id if recipe else None for meal_type, recipe in meals.items()}
+                for day, meals in meal_plan.meals.items()}
+
+    def _meal_plan_from_slots(self, slots):
+        """Rebuilds a meal plan for the current profile from cached slots, or returns None if a recipe is gone."""
+        meal_plan = MealPlan(self.user_profile)
+        for day, meals in slots.items():
+            for meal_type, recipe_id in meals.items():
+                if recipe_id is None:
+                    continue
+                recipe = self.recipe_database.get_recipe_by_id(recipe_id)
+                if recipe is None:
+                    return None
+                meal_plan.add_recipe(day, meal_type, recipe)
+        return meal_plan
+
+    def suggest_meal_swaps(self, day, meal_type, k=5, min_similarity=0.3):
+        """Suggests similar recipes to replace a planned meal within the user's diet and budget."""
+        if day not in self.meal_plan.meals or meal_type not in self.meal_plan.meals[day]:
+            raise ValueError("Invalid day or meal type.")
+        current = self.meal_plan.meals[day][meal_type]
+        if current is None:
+            raise ValueError(f"No recipe planned for {day} {meal_type}.")
+
+        max_cost = None
+        if self.user_profile.budget is not None:
+            max_cost = self.user_profile.budget - (self.meal_plan.calculate_total_cost() - (current.cost or 0))
+        return self.recipe_database.find_similar_recipes(
+            current, k=k, min_similarity=min_similarity,
+            dietary_restrictions=self.user_profile.dietary_restrictions, max_cost=max_cost)
+
     def get_meal_plan(self):
         """Returns the current meal plan."""
         return self.meal_plan
@@ -386,6 +822,7 @@ class MindfulMealPlanner:
             print("8. Search Recipes")
             print("9. Track Food Waste")
             print("10. Add New Recipe")
+            print("11. Swap a Meal for a Similar Recipe")
             print("0. Exit")
 
             choice = input("Enter your choice: ")
@@ -418,6 +855,8 @@ class MindfulMealPlanner:
                     self.handle_track_food_waste()
                 elif choice == "10":
                     self.handle_add_new_recipe()
+                elif choice == "11":
+                    self.handle_swap_meal()
                 elif choice == "0":
                     print("Exiting...")
                     break
@@ -534,6 +973,34 @@ class MindfulMealPlanner:
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
 
+    def handle_swap_meal(self):
+        """Handles swapping a planned meal for a similar recipe."""
+        print("\n--- Swap a Meal ---")
+        day = self._get_valid_day()
+        meal_type = self._get_valid_meal_type()
+        try:
+            suggestions = self.suggest_meal_swaps(day, meal_type)
+        except ValueError as e:
+            print(f"Cannot swap meal: {e}")
+            return
+
+        if not suggestions:
+            print("No similar recipes found within your dietary restrictions and budget.")
+            return
+
+        print("\n--- Similar Recipes ---")
+        for i, (recipe, similarity) in enumerate(suggestions):
+            print(f"{i+1}. {recipe} - {similarity:.0%} ingredient overlap")
+        choice = input("Enter the number of the recipe to use (or leave blank to keep the current meal): ")
+        if not choice:
+            return
+        try:
+            recipe, _ = suggestions[int(choice) - 1]
+        except (ValueError, IndexError):
+            print("Invalid choice. Meal not changed.")
+            return
+        self.add_recipe_to_meal_plan(day, meal_type, recipe)
+
     def _get_list_input(self, prompt):
         """Helper function to get a comma-separated list from the user."""
         input_str = input(prompt)
@@ -601,11 +1068,19 @@ class MindfulMealPlanner:
                 print("Invalid meal type. Please enter Breakfast, Lunch, or Dinner.")
 
 
-def main():
-    """Main function to demonstrate the Mindful Meal Planner application."""
-    planner = MindfulMealPlanner()
+def main(argv=None):
+    """Main function to demonstrate the Mindful Meal Planner application.
+
+    With command-line arguments, runs the non-interactive command-line interface instead of the menu.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from cli import main as cli_main
+        return cli_main(argv)
+    planner = MindfulMealPlanner(plan_history=PlanHistory(HISTORY_DIRECTORY))
     planner.run()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
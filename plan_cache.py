@@ -0,0 +1,114 @@
+"""Content-addressed cache of generated meal plans.
+
+A plan is determined by the normalized user profile, the catalogue version, the
+generator seed and any other generator inputs (such as the user's recent plan
+history), so the SHA-256 of those values addresses it. Entries
+hold only the recipe id chosen for each slot ({day: {meal type: recipe id}});
+the caller rebuilds the MealPlan from its own RecipeDatabase. The most recently
+used entries stay in memory; evicted entries are optionally spilled as JSON files
+into a private directory and promoted back on their next hit.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+
+class PlanCache:
+    """Bounded LRU cache of meal plan slots with optional on-disk spill."""
+
+    def __init__(self, max_entries=128, spill_dir=None, max_spilled=10000):
+        """Initializes a PlanCache holding `max_entries` plans in memory.
+
+        If `spill_dir` is given, evicted plans are written to a private directory
+        created inside it (removed by clear()), up to `max_spilled` files.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.max_entries = max_entries
+        self.max_spilled = max_spilled
+        self._entries = OrderedDict()
+        self._spill_path = tempfile.mkdtemp(prefix="plan-cache-", dir=spill_dir) if spill_dir is not None else None
+        self._spilled = OrderedDict()  # key -> None, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(profile_fingerprint, catalogue_version, seed, context=None):
+        """Returns the content address of a plan request; `context` holds any other JSON-serializable inputs."""
+        payload = json.dumps([profile_fingerprint, catalogue_version, seed, context])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached slots for `key`, or None on a miss."""
+        slots = self._entries.get(key)
+        if slots is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return slots
+
+        slots = self._load_spilled(key)
+        if slots is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.put(key, slots)
+        return slots
+
+    def put(self, key, slots):
+        """Stores the slots of a plan, evicting the least recently used entry if the cache is full."""
+        self._entries[key] = slots
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, evicted_slots = self._entries.popitem(last=False)
+            self._spill(evicted_key, evicted_slots)
+
+    def clear(self):
+        """Removes every cached plan, including spilled ones."""
+        self._entries.clear()
+        self._spilled.clear()
+        if self._spill_path is not None and os.path.isdir(self._spill_path):
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            os.makedirs(self._spill_path, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries) + len(self._spilled)
+
+    def _spill_file(self, key):
+        return os.path.join(self._spill_path, f"{key}.json")
+
+    def _spill(self, key, slots):
+        if self._spill_path is None or self.max_spilled <= 0:
+            return
+        try:
+            with open(self._spill_file(key), "w", encoding="utf-8") as file:
+                json.dump(slots, file)
+        except OSError as e:
+            print(f"Warning: Could not spill cached plan to disk: {e}")
+            return
+        self._spilled[key] = None
+        self._spilled.move_to_end(key)
+        while len(self._spilled) > self.max_spilled:
+            oldest_key, _ = self._spilled.popitem(last=False)
+            self._remove_spill_file(oldest_key)
+
+    def _load_spilled(self, key):
+        if key not in self._spilled:
+            return None
+        del self._spilled[key]
+        try:
+            with open(self._spill_file(key), encoding="utf-8") as file:
+                slots = json.load(file)
+        except (OSError, ValueError):
+            return None
+        finally:
+            self._remove_spill_file(key)
+        return slots
+
+    def _remove_spill_file(self, key):
+        try:
+            os.remove(self._spill_file(key))
+        except OSError:
+            pass
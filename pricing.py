@@ -0,0 +1,234 @@
+"""Ingredient price tables and ingredient-derived recipe costs.
+
+Prices are recorded per ingredient and store as a price for a package quantity
+("1.20 for 500g") and kept internally as a price per base unit (gram, millilitre
+or a count unit such as "clove"). A RecipeCostTracker derives each recipe's cost
+from its parsed ingredient quantities and, when prices change, recomputes only
+the recipes that use the changed ingredients before applying the cost deltas
+to the totals of the meal plans it tracks.
+"""
+import re
+
+# Multiplier to the base unit for every recognised unit spelling.
+UNIT_CONVERSIONS = {
+    "mg": ("g", 0.001), "g": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "kg": ("g", 1000.0), "oz": ("g", 28.35), "lb": ("g", 453.6), "lbs": ("g", 453.6),
+    "ml": ("ml", 1.0), "l": ("ml", 1000.0), "litre": ("ml", 1000.0), "liter": ("ml", 1000.0),
+    "tsp": ("ml", 5.0), "tbsp": ("ml", 15.0), "cup": ("ml", 240.0), "cups": ("ml", 240.0),
+}
+
+_QUANTITY_PATTERN = re.compile(r"^\s*(\d+\s+\d+/\d+|\d+/\d+|\d*\.?\d+)\s*([a-zA-Z][a-zA-Z ]*)?\s*$")
+
+
+def _parse_number(text):
+    if "/" in text:
+        whole, _, fraction = text.rpartition(" ")
+        numerator, denominator = fraction.split("/")
+        if float(denominator) == 0:
+            raise ValueError("Zero denominator.")
+        return (float(whole) if whole else 0.0) + float(numerator) / float(denominator)
+    return float(text)
+
+
+def _normalize_unit(unit):
+    unit = (unit or "").strip().lower()
+    if not unit:
+        return "each", 1.0
+    if unit in UNIT_CONVERSIONS:
+        return UNIT_CONVERSIONS[unit]
+    # Count units such as "2 cloves" or "1 head"; treat plurals as the same unit.
+    if unit.endswith("s") and len(unit) > 1:
+        unit = unit[:-1]
+    return unit, 1.0
+
+
+def parse_quantity(quantity):
+    """Parses a quantity such as "200g", "1.5 cups" or "2 cloves" into (amount, base unit).
+
+    Amounts are converted to grams or millilitres where the unit allows; unitless
+    numbers use the unit "each". Returns None if the quantity cannot be parsed.
+    """
+    if isinstance(quantity, (int, float)):
+        return (float(quantity), "each") if quantity >= 0 else None
+    if not isinstance(quantity, str):
+        return None
+    match = _QUANTITY_PATTERN.match(quantity)
+    if not match:
+        return None
+    try:
+        amount = _parse_number(match.group(1))
+    except ValueError:
+        return None
+    unit, factor = _normalize_unit(match.group(2))
+    return amount * factor, unit
+
+
+class PriceTable:
+    """Stores ingredient prices for several stores as prices per base unit."""
+
+    def __init__(self):
+        """Initializes an empty PriceTable."""
+        self._prices = {}  # ingredient -> {store: (unit, unit price)}
+
+    def set_price(self, ingredient, store, price, quantity="1"):
+        """Records the price of `quantity` of an ingredient at a store. Returns True if it changed."""
+        if price is None or price < 0:
+            raise ValueError("Price must be a non-negative number.")
+        parsed = parse_quantity(quantity)
+        if parsed is None and isinstance(quantity, str):
+            parsed = parse_quantity(f"1 {quantity}")  # A bare unit such as "kg" or "clove"
+        if parsed is None or parsed[0] <= 0:
+            raise ValueError(f"Invalid price quantity '{quantity}'.")
+        amount, unit = parsed
+        entry = (unit, price / amount)
+        stores = self._prices.setdefault(ingredient.strip().lower(), {})
+        if stores.get(store) == entry:
+            return False
+        stores[store] = entry
+        return True
+
+    def remove_price(self, ingredient, store):
+        """Removes a store's price for an ingredient. Returns True if a price was removed."""
+        stores = self._prices.get(ingredient.strip().lower())
+        if not stores or store not in stores:
+            return False
+        del stores[store]
+        if not stores:
+            del self._prices[ingredient.strip().lower()]
+        return True
+
+    def unit_price(self, ingredient, unit, stores=None):
+        """Returns the cheapest price per `unit` of an ingredient, or None if it is not priced in that unit."""
+        best = None
+        for store, (price_unit, unit_price) in self._prices.get(ingredient.strip().lower(), {}).items():
+            if price_unit != unit or (stores is not None and store not in stores):
+                continue
+            if best is None or unit_price < best:
+                best = unit_price
+        return best
+
+    def stores(self):
+        """Returns the set of stores that have at least one price."""
+        return {store for stores in self._prices.values() for store in stores}
+
+
+class RecipeCostTracker:
+    """Derives recipe costs from a PriceTable and keeps them current as prices change.
+
+    Recipes are found through the database's ingredient index, so a price update
+    only recomputes the recipes that contain the changed ingredients. Recipes with
+    an unparseable quantity or an unpriced ingredient keep (or, when a price they
+    relied on is removed, go back to) their entered cost and are reported by
+    unpriced_recipes().
+    """
+
+    def __init__(self, recipe_database, price_table, stores=None):
+        """Initializes the tracker and prices every recipe currently in the database."""
+        self.recipe_database = recipe_database
+        self.price_table = price_table
+        self.stores = set(stores) if stores is not None else None
+        self._unpriced = {}  # recipe id -> ingredients that could not be priced
+        self._entered_costs = {}  # recipe id -> cost the recipe had before a derived cost replaced it
+        self._plans = {}  # id(plan) -> [plan, total cost, {recipe id: slot count}]
+        self._plans_by_recipe = {}  # recipe id -> {id(plan): number of slots using the recipe}
+        self.refresh_recipes(recipe.recipe_id for recipe in recipe_database.recipes)
+
+    def compute_recipe_cost(self, recipe):
+        """Returns (cost, unpriced ingredients) for a recipe under the current prices."""
+        total = 0.0
+        unpriced = set()
+        for ingredient, quantity in recipe.ingredients.items():
+            parsed = parse_quantity(quantity)
+            unit_price = self.price_table.unit_price(ingredient, parsed[1], self.stores) if parsed else None
+            if unit_price is None:
+                unpriced.add(ingredient)
+                continue
+            total += parsed[0] * unit_price
+        return round(total, 2), unpriced
+
+    def refresh_recipes(self, recipe_ids):
+        """Recomputes the cost of the given recipes. Returns {recipe id: new cost} for those that changed."""
+        changed = {}
+        for recipe_id in recipe_ids:
+            recipe = self.recipe_database.get_recipe_by_id(recipe_id)
+            if recipe is None:
+                self._unpriced.pop(recipe_id, None)
+                self._entered_costs.pop(recipe_id, None)
+                continue
+            cost, unpriced = self.compute_recipe_cost(recipe)
+            if unpriced:
+                self._unpriced[recipe_id] = unpriced
+                if recipe_id not in self._entered_costs:
+                    continue
+                cost = self._entered_costs.pop(recipe_id)  # The derived cost is stale; restore the entered one
+            else:
+                self._unpriced.pop(recipe_id, None)
+                self._entered_costs.setdefault(recipe_id, recipe.cost)
+            old_cost = recipe.cost
+            if old_cost != cost:
+                self.recipe_database.update_recipe(recipe_id, cost=cost)
+                changed[recipe_id] = cost
+                self._apply_cost_delta(recipe_id, (cost or 0) - (old_cost or 0))
+        return changed
+
+    def set_price(self, ingredient, store, price, quantity="1"):
+        """Updates a single price and recomputes the affected recipes."""
+        return self.apply_price_updates([(ingredient, store, price, quantity)])
+
+    def apply_price_updates(self, updates):
+        """Applies (ingredient, store, price, quantity) updates; a price of None removes the store's price.
+
+        Returns {recipe id: new cost} for the recipes whose cost changed.
+        """
+        changed_ingredients = set()
+        for ingredient, store, price, quantity in updates:
+            if price is None:
+                changed = self.price_table.remove_price(ingredient, store)
+            else:
+                changed = self.price_table.set_price(ingredient, store, price, quantity)
+            if changed:
+                changed_ingredients.add(ingredient)
+
+        affected = set()
+        for ingredient in changed_ingredients:
+            affected.update(self.recipe_database.recipes_with_ingredient(ingredient))
+        return self.refresh_recipes(sorted(affected))
+
+    def unpriced_recipes(self):
+        """Returns {recipe id: set of ingredients} for recipes whose cost could not be derived."""
+        return {recipe_id: set(ingredients) for recipe_id, ingredients in self._unpriced.items()}
+
+    def track_plan(self, meal_plan):
+        """Starts keeping the cost total of a meal plan current. Call again after editing the plan."""
+        self.untrack_plan(meal_plan)
+        plan_key = id(meal_plan)
+        counts = {}
+        for meals in meal_plan.meals.values():
+            for recipe in meals.values():
+                if recipe is not None and recipe.recipe_id is not None:
+                    counts[recipe.recipe_id] = counts.get(recipe.recipe_id, 0) + 1
+        for recipe_id, count in counts.items():
+            self._plans_by_recipe.setdefault(recipe_id, {})[plan_key] = count
+        self._plans[plan_key] = [meal_plan, meal_plan.calculate_total_cost(), counts]
+
+    def untrack_plan(self, meal_plan):
+        """Stops tracking a meal plan."""
+        entry = self._plans.pop(id(meal_plan), None)
+        if entry is None:
+            return
+        for recipe_id in entry[2]:
+            usage = self._plans_by_recipe[recipe_id]
+            del usage[id(meal_plan)]
+            if not usage:
+                del self._plans_by_recipe[recipe_id]
+
+    def plan_total(self, meal_plan):
+        """Returns the tracked cost total of a meal plan."""
+        entry = self._plans.get(id(meal_plan))
+        if entry is None:
+            raise ValueError("Meal plan is not tracked.")
+        return round(entry[1], 2)
+
+    def _apply_cost_delta(self, recipe_id, delta):
+        for plan_key, count in self._plans_by_recipe.get(recipe_id, {}).items():
+            self._plans[plan_key][1] += delta * count
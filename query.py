@@ -0,0 +1,303 @@
+"""Composable recipe queries compiled to operations over RecipeDatabase indexes.
+
+Queries are built from leaf predicates and combined with & (and), | (or) and
+~ (not):
+
+    query = (Cuisine("Italian", "Mexican") & HasTag("vegetarian")
+             & ~HasIngredient("mushrooms") & CostBetween(max_cost=8) & MaxIngredients(6))
+    cheapest = recipe_database.query(query, limit=5, order_by_cost=True)
+
+The QueryPlanner estimates the size of every sub-query from index statistics,
+evaluates conjunctions starting with the most selective operand and subtracts
+negated operands instead of materializing their complements. Cost ranges are
+answered by bisecting the database's sorted cost list. With a limit, execution
+drives from the most selective index and stops as soon as enough recipes match;
+top-k cheapest queries walk the cost list in order when the match set is large.
+"""
+from bisect import bisect_left, bisect_right
+import heapq
+
+
+class Query:
+    """Base class of query expressions."""
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def matches(self, recipe):
+        """Returns True if a single recipe satisfies the query."""
+        raise NotImplementedError
+
+
+class Cuisine(Query):
+    """Matches recipes of any of the given cuisines."""
+
+    def __init__(self, *cuisines):
+        if not cuisines:
+            raise ValueError("Cuisine needs at least one cuisine.")
+        self.cuisines = {cuisine.strip().lower() for cuisine in cuisines}
+
+    def matches(self, recipe):
+        return recipe.cuisine.lower() in self.cuisines
+
+    def __repr__(self):
+        return f"Cuisine({', '.join(sorted(self.cuisines))})"
+
+
+class HasTag(Query):
+    """Matches recipes carrying a dietary tag, explicitly or inferred from their ingredients."""
+
+    def __init__(self, tag):
+        self.tag = tag.strip().lower()
+
+    def matches(self, recipe):
+        return recipe.has_dietary_tag(self.tag)
+
+    def __repr__(self):
+        return f"HasTag({self.tag})"
+
+
+class HasIngredient(Query):
+    """Matches recipes using an ingredient. Use ~HasIngredient(...) to exclude one."""
+
+    def __init__(self, ingredient):
+        self.ingredient = ingredient.strip().lower()
+
+    def matches(self, recipe):
+        return self.ingredient in {ingredient.strip().lower() for ingredient in recipe.ingredients}
+
+    def __repr__(self):
+        return f"HasIngredient({self.ingredient})"
+
+
+class CostBetween(Query):
+    """Matches recipes with a known cost in [min_cost, max_cost]; either bound may be omitted."""
+
+    def __init__(self, min_cost=None, max_cost=None):
+        if min_cost is not None and max_cost is not None and min_cost > max_cost:
+            raise ValueError("min_cost must not exceed max_cost.")
+        self.min_cost = min_cost
+        self.max_cost = max_cost
+
+    def matches(self, recipe):
+        if recipe.cost is None:
+            return False
+        return ((self.min_cost is None or recipe.cost >= self.min_cost)
+                and (self.max_cost is None or recipe.cost <= self.max_cost))
+
+    def __repr__(self):
+        return f"CostBetween({self.min_cost}, {self.max_cost})"
+
+
+class MaxIngredients(Query):
+    """Matches recipes with at most `count` ingredients."""
+
+    def __init__(self, count):
+        if count < 0:
+            raise ValueError("count must not be negative.")
+        self.count = count
+
+    def matches(self, recipe):
+        return len(recipe.ingredients) <= self.count
+
+    def __repr__(self):
+        return f"MaxIngredients({self.count})"
+
+
+class And(Query):
+    """Matches recipes satisfying every operand."""
+
+    def __init__(self, *operands):
+        if not operands:
+            raise ValueError("And needs at least one operand.")
+        self.operands = []
+        for operand in operands:
+            self.operands.extend(operand.operands if isinstance(operand, And) else [operand])
+
+    def matches(self, recipe):
+        return all(operand.matches(recipe) for operand in self.operands)
+
+    def __repr__(self):
+        return f"And({', '.join(map(repr, self.operands))})"
+
+
+class Or(Query):
+    """Matches recipes satisfying at least one operand."""
+
+    def __init__(self, *operands):
+        if not operands:
+            raise ValueError("Or needs at least one operand.")
+        self.operands = []
+        for operand in operands:
+            self.operands.extend(operand.operands if isinstance(operand, Or) else [operand])
+
+    def matches(self, recipe):
+        return any(operand.matches(recipe) for operand in self.operands)
+
+    def __repr__(self):
+        return f"Or({', '.join(map(repr, self.operands))})"
+
+
+class Not(Query):
+    """Matches recipes that do not satisfy the operand."""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def matches(self, recipe):
+        return not self.operand.matches(recipe)
+
+    def __repr__(self):
+        return f"Not({self.operand!r})"
+
+
+class QueryPlanner:
+    """Plans and executes queries against the indexes of a RecipeDatabase."""
+
+    def __init__(self, recipe_database):
+        """Initializes a QueryPlanner for `recipe_database`."""
+        self.db = recipe_database
+
+    def _universe_size(self):
+        return len(self.db._recipes_by_id)
+
+    def _cost_bounds(self, node):
+        costs = self.db._cost_index
+        start = 0 if node.min_cost is None else bisect_left(costs, (node.min_cost, -1))
+        end = len(costs) if node.max_cost is None else bisect_right(costs, (node.max_cost, float("inf")))
+        return start, end
+
+    def estimate(self, node):
+        """Returns an estimate of the number of recipes matching `node`."""
+        db = self.db
+        if isinstance(node, Cuisine):
+            return sum(len(db._cuisine_index.get(cuisine, ())) for cuisine in node.cuisines)
+        if isinstance(node, HasTag):
+            return len(db._tag_index.get(node.tag, ()))
+        if isinstance(node, HasIngredient):
+            return len(db._ingredient_index.get(node.ingredient, ()))
+        if isinstance(node, CostBetween):
+            start, end = self._cost_bounds(node)
+            return end - start
+        if isinstance(node, MaxIngredients):
+            return sum(len(ids) for count, ids in db._size_index.items() if count <= node.count)
+        if isinstance(node, And):
+            positives = [self.estimate(operand) for operand in node.operands if not isinstance(operand, Not)]
+            return min(positives) if positives else self._universe_size()
+        if isinstance(node, Or):
+            return min(sum(self.estimate(operand) for operand in node.operands), self._universe_size())
+        if isinstance(node, Not):
+            return max(self._universe_size() - self.estimate(node.operand), 0)
+        raise TypeError(f"Unsupported query node: {node!r}")
+
+    def evaluate(self, node):
+        """Returns the set of recipe ids matching `node`."""
+        db = self.db
+        if isinstance(node, Cuisine):
+            ids = set()
+            for cuisine in node.cuisines:
+                ids.update(db._cuisine_index.get(cuisine, ()))
+            return ids
+        if isinstance(node, HasTag):
+            return set(db._tag_index.get(node.tag, ()))
+        if isinstance(node, HasIngredient):
+            return set(db._ingredient_index.get(node.ingredient, ()))
+        if isinstance(node, CostBetween):
+            start, end = self._cost_bounds(node)
+            return {recipe_id for _, recipe_id in db._cost_index[start:end]}
+        if isinstance(node, MaxIngredients):
+            ids = set()
+            for count, recipe_ids in db._size_index.items():
+                if count <= node.count:
+                    ids.update(recipe_ids)
+            return ids
+        if isinstance(node, And):
+            return self._evaluate_and(node)
+        if isinstance(node, Or):
+            ids = set()
+            for operand in node.operands:
+                ids |= self.evaluate(operand)
+            return ids
+        if isinstance(node, Not):
+            return set(db._recipes_by_id) - self.evaluate(node.operand)
+        raise TypeError(f"Unsupported query node: {node!r}")
+
+    def _evaluate_and(self, node):
+        positives = sorted((operand for operand in node.operands if not isinstance(operand, Not)), key=self.estimate)
+        negatives = [operand.operand for operand in node.operands if isinstance(operand, Not)]
+        ids = self.evaluate(positives[0]) if positives else set(self.db._recipes_by_id)
+        for operand in positives[1:]:
+            if not ids:
+                return ids
+            ids &= self.evaluate(operand)
+        for operand in sorted(negatives, key=self.estimate):
+            if not ids:
+                return ids
+            ids -= self.evaluate(operand)
+        return ids
+
+    def _driver(self, node):
+        """Returns the most selective sub-query whose matches contain every match of `node`."""
+        if isinstance(node, And):
+            positives = [operand for operand in node.operands if not isinstance(operand, Not)]
+            if positives:
+                return min(positives, key=self.estimate)
+        return node
+
+    def execute(self, node, limit=None, order_by_cost=False):
+        """Returns the recipes matching `node`.
+
+        Results are in recipe id order, or cheapest first with order_by_cost (recipes
+        without a cost come last). `limit` caps the number of results.
+        """
+        if limit is not None and limit <= 0:
+            return []
+        db = self.db
+        if order_by_cost:
+            return self._execute_by_cost(node, limit)
+
+        if limit is None:
+            return [db._recipes_by_id[recipe_id] for recipe_id in sorted(self.evaluate(node))]
+
+        driver = self._driver(node)
+        results = []
+        for recipe_id in sorted(self.evaluate(driver)):
+            recipe = db._recipes_by_id[recipe_id]
+            if driver is node or node.matches(recipe):
+                results.append(recipe)
+                if len(results) == limit:
+                    break
+        return results
+
+    def _execute_by_cost(self, node, limit):
+        db = self.db
+        estimate = max(self.estimate(node), 1)
+        # Walking the cost list visits about limit * N / estimate recipes before finding
+        # `limit` matches; materializing the match set costs about `estimate`.
+        if limit is not None and limit * self._universe_size() < estimate * estimate:
+            results = []
+            for _, recipe_id in db._cost_index:
+                recipe = db._recipes_by_id[recipe_id]
+                if node.matches(recipe):
+                    results.append(recipe)
+                    if len(results) == limit:
+                        return results
+            for recipe_id in sorted(db._recipes_by_id):
+                recipe = db._recipes_by_id[recipe_id]
+                if recipe.cost is None and node.matches(recipe):
+                    results.append(recipe)
+                    if len(results) == limit:
+                        break
+            return results
+
+        ids = self.evaluate(node)
+        key = lambda recipe_id: (db._recipes_by_id[recipe_id].cost is None, db._recipes_by_id[recipe_id].cost or 0,
+                                 recipe_id)
+        ordered = heapq.nsmallest(limit, ids, key=key) if limit is not None else sorted(ids, key=key)
+        return [db._recipes_by_id[recipe_id] for recipe_id in ordered]
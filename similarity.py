@@ -0,0 +1,136 @@
+import hashlib
+import random
+
+# Mersenne prime used as the modulus of the universal hash family.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _base_hash(token):
+    """Returns a stable 64-bit hash of a token (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """Builds MinHash signatures that estimate the Jaccard similarity of ingredient sets."""
+
+    def __init__(self, num_perm=64, seed=1):
+        """Initializes a MinHasher with `num_perm` seeded hash permutations."""
+        if num_perm <= 0:
+            raise ValueError("num_perm must be positive.")
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._coefficients = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, tokens):
+        """Returns the MinHash signature (a tuple of ints) for an iterable of tokens."""
+        hashes = [_base_hash(token) for token in set(tokens)]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in self._coefficients)
+
+    @staticmethod
+    def estimate_similarity(signature1, signature2):
+        """Estimates the Jaccard similarity of two sets from their signatures."""
+        if len(signature1) != len(signature2):
+            raise ValueError("Signatures must have the same length.")
+        matches = sum(1 for x, y in zip(signature1, signature2) if x == y)
+        return matches / len(signature1)
+
+
+def _integrate(function, start, end, steps=100):
+    """Returns the midpoint-rule integral of `function` over [start, end]."""
+    width = (end - start) / steps
+    return sum(function(start + (i + 0.5) * width) for i in range(steps)) * width
+
+
+def lsh_parameters(num_perm, threshold):
+    """Returns (bands, rows) for an LSH index whose candidate threshold is close to `threshold`.
+
+    Two sets with Jaccard similarity s become candidates with probability
+    1 - (1 - s**rows)**bands. The split minimising the false positive area below
+    `threshold` plus the false negative area above it is chosen; for 64
+    permutations, a threshold of 0.3 gives 21 bands of 3 rows. bands * rows may
+    be less than num_perm, in which case the trailing signature values are unused.
+    """
+    if num_perm <= 0:
+        raise ValueError("num_perm must be positive.")
+    if not 0 < threshold < 1:
+        raise ValueError("threshold must be between 0 and 1.")
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        false_positives = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        false_negatives = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        error = false_positives + false_negatives
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class LSHIndex:
+    """Locality-sensitive hashing index that buckets MinHash signatures by bands.
+
+    Two signatures become candidates when they agree on every row of at least one
+    band, so a lookup only touches the buckets of the query's own bands instead of
+    every indexed signature. Without an explicit number of bands, the bands and
+    rows are derived from `threshold`, the similarity above which pairs should
+    become candidates (see lsh_parameters()).
+    """
+
+    def __init__(self, num_perm=64, bands=None, threshold=0.3):
+        """Initializes an LSHIndex splitting `num_perm` signature values into bands."""
+        if bands is None:
+            bands, rows = lsh_parameters(num_perm, threshold)
+        else:
+            if bands <= 0 or bands > num_perm:
+                raise ValueError("bands must be between 1 and num_perm.")
+            rows = num_perm // bands
+        self.bands = bands
+        self.rows = rows
+        self._buckets = [{} for _ in range(bands)]
+        self._keys = {}
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [tuple(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def insert(self, key, signature):
+        """Adds a signature to the index under `key`, replacing any previous entry."""
+        if key in self._keys:
+            self.remove(key)
+        band_keys = self._band_keys(signature)
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key):
+        """Removes `key` from the index. Unknown keys are ignored."""
+        band_keys = self._keys.pop(key, None)
+        if band_keys is None:
+            return
+        for band, band_key in enumerate(band_keys):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, signature):
+        """Returns the set of keys sharing at least one band bucket with `signature`."""
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def jaccard_similarity(set1, set2):
+    """Returns the exact Jaccard similarity of two sets."""
+    if not set1 and not set2:
+        return 1.0
+    return len(set1 & set2) / len(set1 | set2)
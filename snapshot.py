@@ -0,0 +1,292 @@
+"""Read-only binary catalogue snapshots shared between processes through mmap.
+
+write_snapshot() serializes a RecipeDatabase into a single file made of aligned
+sections:
+
+* fixed-width columns: recipe ids (int64), costs (float64, NaN when unknown),
+  cuisine and name string ids (uint32) and bitmasks (uint64) of the explicit
+  and inferred dietary tags;
+* offset-indexed pools: strings (UTF-8), ingredient (name, quantity) pairs and
+  instruction lists;
+* serialized indexes: sorted keys with posting lists of row numbers for
+  cuisines, tags, ingredients and names, and the rows ordered by cost.
+
+CatalogueSnapshot maps the file and reads those sections in place with
+memoryview casts, so every worker process shares the same pages of the page
+cache. Recipe objects are only built when a row is materialized.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import math
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"MMPSNAP1"
+FORMAT_VERSION = 1
+MAX_TAGS = 64
+
+_HEADER = struct.Struct("<8sIIB7x")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = [
+    ("ids", "q"), ("costs", "d"), ("cuisines", "I"), ("names", "I"), ("tags", "Q"),
+    ("ingredient_offsets", "I"), ("ingredients", "I"),
+    ("instruction_offsets", "I"), ("instructions", "I"),
+    ("string_offsets", "I"), ("strings", "B"),
+    ("tag_vocabulary", "I"), ("cost_order", "I"),
+    ("cuisine_index_keys", "I"), ("cuisine_index_offsets", "I"), ("cuisine_index_postings", "I"),
+    ("tag_index_keys", "I"), ("tag_index_offsets", "I"), ("tag_index_postings", "I"),
+    ("ingredient_index_keys", "I"), ("ingredient_index_offsets", "I"), ("ingredient_index_postings", "I"),
+    ("name_index_keys", "I"), ("name_index_offsets", "I"), ("name_index_postings", "I"),
+]
+_INDEXES = ("cuisine", "tag", "ingredient", "name")
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be written or read."""
+
+
+class _StringPool:
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def intern(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.offsets) - 1
+            self.data += text.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return string_id
+
+
+def _build_index(pool, postings_by_key):
+    """Returns (key string ids sorted by key, posting offsets, postings) for {key: [rows]}."""
+    keys = array("I")
+    offsets = array("I", [0])
+    postings = array("I")
+    for key in sorted(postings_by_key):
+        keys.append(pool.intern(key))
+        postings.extend(postings_by_key[key])
+        offsets.append(len(postings))
+    return keys, offsets, postings
+
+
+def write_snapshot(recipe_database, path):
+    """Writes the recipes of a RecipeDatabase to a snapshot file, replacing it atomically."""
+    pool = _StringPool()
+    columns = {name: array(typecode) for name, typecode in _SECTIONS if typecode != "B"}
+    columns["ingredient_offsets"].append(0)
+    columns["instruction_offsets"].append(0)
+    tag_bits = {}
+    indexes = {index_name: {} for index_name in _INDEXES}
+
+    for row, recipe in enumerate(recipe_database.recipes):
+        columns["ids"].append(recipe.recipe_id)
+        columns["costs"].append(float(recipe.cost) if recipe.cost is not None else math.nan)
+        columns["cuisines"].append(pool.intern(recipe.cuisine))
+        columns["names"].append(pool.intern(recipe.name))
+
+        mask = 0
+        for tag in recipe.dietary_tags():
+            if tag not in tag_bits:
+                if len(tag_bits) == MAX_TAGS:
+                    raise SnapshotError(f"Snapshots support at most {MAX_TAGS} distinct dietary tags.")
+                tag_bits[tag] = len(tag_bits)
+                columns["tag_vocabulary"].append(pool.intern(tag))
+            mask |= 1 << tag_bits[tag]
+            indexes["tag"].setdefault(tag, []).append(row)
+        columns["tags"].append(mask)
+
+        for ingredient, quantity in recipe.ingredients.items():
+            columns["ingredients"].append(pool.intern(ingredient))
+            columns["ingredients"].append(pool.intern(str(quantity)))
+        columns["ingredient_offsets"].append(len(columns["ingredients"]) // 2)
+        for ingredient in {ingredient.strip().lower() for ingredient in recipe.ingredients}:
+            indexes["ingredient"].setdefault(ingredient, []).append(row)
+
+        for step in recipe.instructions:
+            columns["instructions"].append(pool.intern(step))
+        columns["instruction_offsets"].append(len(columns["instructions"]))
+
+        indexes["cuisine"].setdefault(recipe.cuisine.lower(), []).append(row)
+        indexes["name"].setdefault(recipe.name.lower(), []).append(row)
+
+    costs = columns["costs"]
+    columns["cost_order"].extend(sorted((row for row in range(len(costs)) if not math.isnan(costs[row])),
+                                        key=costs.__getitem__))
+    for index_name in _INDEXES:
+        keys, offsets, postings = _build_index(pool, indexes[index_name])
+        columns[f"{index_name}_index_keys"] = keys
+        columns[f"{index_name}_index_offsets"] = offsets
+        columns[f"{index_name}_index_postings"] = postings
+    columns["string_offsets"] = pool.offsets
+
+    payloads = [bytes(pool.data) if typecode == "B" else columns[name].tobytes() for name, typecode in _SECTIONS]
+    offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    table = []
+    for payload in payloads:
+        offset += -offset % 8
+        table.append((offset, len(payload)))
+        offset += len(payload)
+
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(_SECTIONS), _BYTE_ORDER))
+            for section_offset, length in table:
+                file.write(_SECTION.pack(section_offset, length))
+            for (section_offset, _), payload in zip(table, payloads):
+                file.write(b"\0" * (section_offset - file.tell()))
+                file.write(payload)
+        os.replace(temp_path, path)
+    except OSError as e:
+        raise SnapshotError(f"Could not write snapshot '{path}': {e}")
+
+
+class CatalogueSnapshot:
+    """Read-only view of a snapshot file, queried in place through mmap."""
+
+    def __init__(self, path):
+        """Maps the snapshot at `path` and validates its header."""
+        try:
+            with open(path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Could not open snapshot '{path}': {e}")
+        self._buffer = memoryview(self._mmap)
+
+        if len(self._buffer) < _HEADER.size:
+            raise SnapshotError(f"'{path}' is not a catalogue snapshot.")
+        magic, version, section_count, byte_order = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise SnapshotError(f"'{path}' is not a catalogue snapshot.")
+        if version != FORMAT_VERSION or section_count != len(_SECTIONS):
+            raise SnapshotError(f"Unsupported snapshot format version {version}.")
+        if byte_order != _BYTE_ORDER:
+            raise SnapshotError("Snapshot was written on a machine with a different byte order.")
+
+        for i, (name, typecode) in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(self._buffer, _HEADER.size + i * _SECTION.size)
+            section = self._buffer[offset:offset + length]
+            setattr(self, f"_{name}", section if typecode == "B" else section.cast(typecode))
+        self._tag_bits = {self._string(string_id): bit for bit, string_id in enumerate(self._tag_vocabulary)}
+
+    def close(self):
+        """Releases the mapping; if a view into it is still alive, the file is unmapped once that view is freed."""
+        for name, _ in _SECTIONS:
+            getattr(self, f"_{name}").release()
+        self._buffer.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # The mmap object unmaps the file itself when the last view is garbage-collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _string(self, string_id):
+        return str(self._strings[self._string_offsets[string_id]:self._string_offsets[string_id + 1]], "utf-8")
+
+    def _lookup(self, index_name, key):
+        """Returns the posting list (a list of rows) for `key`, which is empty if it is absent."""
+        keys = getattr(self, f"_{index_name}_index_keys")
+        offsets = getattr(self, f"_{index_name}_index_offsets")
+        postings = getattr(self, f"_{index_name}_index_postings")
+        position = bisect_left(keys, key, key=self._string)
+        if position < len(keys) and self._string(keys[position]) == key:
+            return postings[offsets[position]:offsets[position + 1]].tolist()
+        return []
+
+    def recipe_id(self, row):
+        """Returns the recipe id stored in a row."""
+        return self._ids[row]
+
+    def name(self, row):
+        """Returns the recipe name stored in a row."""
+        return self._string(self._names[row])
+
+    def cuisine(self, row):
+        """Returns the cuisine stored in a row."""
+        return self._string(self._cuisines[row])
+
+    def cost(self, row):
+        """Returns the cost stored in a row, or None if it is unknown."""
+        cost = self._costs[row]
+        return None if math.isnan(cost) else cost
+
+    def dietary_info(self, row):
+        """Returns the dietary tags of a row."""
+        mask = self._tags[row]
+        return [self._string(string_id) for bit, string_id in enumerate(self._tag_vocabulary) if mask >> bit & 1]
+
+    def ingredients(self, row):
+        """Returns the {ingredient: quantity} dictionary of a row."""
+        entries = self._ingredients[2 * self._ingredient_offsets[row]:2 * self._ingredient_offsets[row + 1]]
+        return {self._string(entries[i]): self._string(entries[i + 1]) for i in range(0, len(entries), 2)}
+
+    def get_recipe(self, row):
+        """Materializes the Recipe stored in a row."""
+        from main import Recipe
+
+        instructions = self._instructions[self._instruction_offsets[row]:self._instruction_offsets[row + 1]]
+        recipe = Recipe(self.name(row), self.ingredients(row), [self._string(string_id) for string_id in instructions],
+                        self.cuisine(row), self.dietary_info(row), self.cost(row))
+        recipe.recipe_id = self.recipe_id(row)
+        return recipe
+
+    def get_recipe_by_name(self, name):
+        """Materializes the first recipe with the given name, or returns None."""
+        rows = self._lookup("name", name.lower())
+        return self.get_recipe(rows[0]) if rows else None
+
+    def rows_in_cost_range(self, min_cost=None, max_cost=None):
+        """Returns the rows whose cost lies in [min_cost, max_cost], cheapest first."""
+        start = 0 if min_cost is None else bisect_left(self._cost_order, min_cost, key=self._costs.__getitem__)
+        end = len(self._cost_order) if max_cost is None else bisect_right(self._cost_order, max_cost,
+                                                                          key=self._costs.__getitem__)
+        return self._cost_order[start:end].tolist()
+
+    def find_rows(self, cuisine=None, dietary_info=None, ingredients=None):
+        """Returns the rows matching the criteria with the semantics of RecipeDatabase.search_recipes."""
+        candidates = None
+        if cuisine is not None:
+            cuisines = cuisine if isinstance(cuisine, list) else [cuisine]
+            candidates = set()
+            for value in cuisines:
+                candidates.update(self._lookup("cuisine", value.lower()))
+        for ingredient in ingredients or []:
+            rows = self._lookup("ingredient", ingredient.strip().lower())
+            candidates = set(rows) if candidates is None else candidates.intersection(rows)
+            if not candidates:
+                return []
+
+        rows = None if candidates is None else sorted(candidates)
+        if dietary_info:
+            dietary_info = [tag.lower() for tag in (dietary_info if isinstance(dietary_info, list) else [dietary_info])]
+            mask = 0
+            for tag in dietary_info:
+                bit = self._tag_bits.get(tag)
+                if bit is None:
+                    return []
+                mask |= 1 << bit
+            if rows is None:  # Start from the shortest tag posting list instead of scanning every row
+                rows = min((self._lookup("tag", tag) for tag in dietary_info), key=len)
+            tags = self._tags
+            rows = [row for row in rows if tags[row] & mask == mask]
+        return list(range(len(self))) if rows is None else rows
+
+    def search_recipes(self, criteria=None):
+        """Materializes the recipes matching a search_recipes-style criteria dictionary."""
+        criteria = {key.lower(): value for key, value in (criteria or {}).items()}
+        rows = self.find_rows(criteria.get("cuisine"), criteria.get("dietary_info"), criteria.get("ingredients"))
+        return [self.get_recipe(row) for row in rows]
@@ -0,0 +1,202 @@
+"""Ingredient taxonomy used to infer dietary tags and allergens from ingredients.
+
+Every ingredient name is mapped once to a bitmask of the categories it belongs
+to (meat, dairy, gluten, ...) by matching its words against the keyword table,
+longest phrase first, so "peanut butter" is a peanut product and not dairy and
+"eggplant" is not an egg. A recipe's mask is the OR of its ingredients' masks,
+and each dietary tag is a check that certain category bits are clear:
+
+    mask = recipe_mask({"spaghetti": "200g", "parmesan cheese": "50g"})  # GLUTEN | DAIRY
+    satisfies(mask, "vegetarian")   # True:  mask & DIETARY_EXCLUSIONS["vegetarian"] == 0
+    satisfies(mask, "gluten-free")  # False
+
+Inference is conservative: an ingredient is only recognised if every word of
+its name is a known keyword, a known safe ingredient or a descriptive word
+such as "chopped". Anything else sets the UNKNOWN bit, and since every dietary
+tag excludes UNKNOWN, a recipe with an unrecognised ingredient is never
+inferred to be vegan, gluten-free, nut-free, etc. Explicit tags then still
+apply, unless a recognised ingredient contradicts them (see contradicts()):
+chicken rules out "vegan" however the recipe was tagged.
+"""
+import re
+
+MEAT = 1 << 0
+POULTRY = 1 << 1
+FISH = 1 << 2
+SHELLFISH = 1 << 3
+DAIRY = 1 << 4
+EGG = 1 << 5
+HONEY = 1 << 6
+GLUTEN = 1 << 7
+TREE_NUT = 1 << 8
+PEANUT = 1 << 9
+SOY = 1 << 10
+SESAME = 1 << 11
+UNKNOWN = 1 << 12  # At least one ingredient is not covered by the taxonomy
+
+CATEGORY_NAMES = {
+    MEAT: "meat", POULTRY: "poultry", FISH: "fish", SHELLFISH: "shellfish", DAIRY: "dairy", EGG: "egg",
+    HONEY: "honey", GLUTEN: "gluten", TREE_NUT: "tree nuts", PEANUT: "peanuts", SOY: "soy", SESAME: "sesame",
+}
+ALLERGENS = FISH | SHELLFISH | DAIRY | EGG | GLUTEN | TREE_NUT | PEANUT | SOY | SESAME
+
+# Dietary tag -> categories a recipe must not contain to carry the tag.
+DIETARY_EXCLUSIONS = {
+    "vegan": MEAT | POULTRY | FISH | SHELLFISH | DAIRY | EGG | HONEY | UNKNOWN,
+    "vegetarian": MEAT | POULTRY | FISH | SHELLFISH | UNKNOWN,
+    "pescatarian": MEAT | POULTRY | UNKNOWN,
+    "gluten-free": GLUTEN | UNKNOWN,
+    "dairy-free": DAIRY | UNKNOWN,
+    "egg-free": EGG | UNKNOWN,
+    "nut-free": TREE_NUT | PEANUT | UNKNOWN,
+    "soy-free": SOY | UNKNOWN,
+}
+
+# Keywords and phrases (singular, lower case) -> categories.
+KEYWORDS = {
+    "meat": MEAT, "beef": MEAT, "steak": MEAT, "pork": MEAT, "ham": MEAT, "bacon": MEAT, "pancetta": MEAT,
+    "guanciale": MEAT, "lamb": MEAT, "mutton": MEAT, "veal": MEAT, "sausage": MEAT, "salami": MEAT,
+    "pepperoni": MEAT, "prosciutto": MEAT, "chorizo": MEAT, "pastrami": MEAT, "venison": MEAT, "mince": MEAT,
+    "meatball": MEAT, "gelatin": MEAT, "gelatine": MEAT, "lard": MEAT, "goat": MEAT, "rabbit": MEAT,
+    "poultry": POULTRY, "chicken": POULTRY, "turkey": POULTRY, "duck": POULTRY, "goose": POULTRY,
+    "fish": FISH, "salmon": FISH, "tuna": FISH, "cod": FISH, "anchovy": FISH, "sardine": FISH, "trout": FISH,
+    "tilapia": FISH, "haddock": FISH, "mackerel": FISH, "halibut": FISH, "fish sauce": FISH,
+    "worcestershire": FISH,
+    "shellfish": SHELLFISH, "shrimp": SHELLFISH, "prawn": SHELLFISH, "crab": SHELLFISH, "lobster": SHELLFISH,
+    "clam": SHELLFISH, "mussel": SHELLFISH, "oyster": SHELLFISH, "scallop": SHELLFISH, "squid": SHELLFISH,
+    "calamari": SHELLFISH, "octopus": SHELLFISH, "oyster sauce": SHELLFISH,
+    "seafood": FISH | SHELLFISH,
+    "dairy": DAIRY, "milk": DAIRY, "cheese": DAIRY, "butter": DAIRY, "cream": DAIRY, "yogurt": DAIRY,
+    "yoghurt": DAIRY, "ghee": DAIRY, "parmesan": DAIRY, "mozzarella": DAIRY, "cheddar": DAIRY, "feta": DAIRY,
+    "ricotta": DAIRY, "whey": DAIRY, "buttermilk": DAIRY, "paneer": DAIRY,
+    "egg": EGG, "mayonnaise": EGG, "mayo": EGG, "meringue": EGG,
+    "honey": HONEY,
+    "gluten": GLUTEN, "wheat": GLUTEN, "flour": GLUTEN, "bread": GLUTEN, "breadcrumb": GLUTEN, "pasta": GLUTEN,
+    "spaghetti": GLUTEN, "macaroni": GLUTEN, "noodle": GLUTEN, "couscous": GLUTEN, "barley": GLUTEN,
+    "rye": GLUTEN, "oat": GLUTEN, "semolina": GLUTEN, "bulgur": GLUTEN, "seitan": GLUTEN, "tortilla": GLUTEN,
+    "pita": GLUTEN, "cracker": GLUTEN, "lasagna": GLUTEN, "penne": GLUTEN, "fettuccine": GLUTEN,
+    "gnocchi": GLUTEN, "croissant": GLUTEN | DAIRY | EGG,
+    "nut": TREE_NUT | PEANUT, "almond": TREE_NUT, "walnut": TREE_NUT, "cashew": TREE_NUT, "pecan": TREE_NUT,
+    "pistachio": TREE_NUT, "hazelnut": TREE_NUT, "macadamia": TREE_NUT, "pine nut": TREE_NUT,
+    "marzipan": TREE_NUT, "praline": TREE_NUT,
+    "peanut": PEANUT, "peanut butter": PEANUT,
+    "soy": SOY, "soya": SOY, "tofu": SOY, "tempeh": SOY, "edamame": SOY, "miso": SOY,
+    "soy sauce": SOY | GLUTEN, "soy milk": SOY, "tamari": SOY,
+    "sesame": SESAME, "tahini": SESAME,
+    # Phrases that would otherwise match a keyword above.
+    "almond milk": TREE_NUT, "coconut milk": 0, "oat milk": GLUTEN, "rice milk": 0, "cashew milk": TREE_NUT,
+    "almond butter": TREE_NUT, "cocoa butter": 0, "nut butter": TREE_NUT | PEANUT, "cream of tartar": 0,
+    "corn tortilla": 0, "rice noodle": 0, "rice flour": 0, "almond flour": TREE_NUT, "coconut cream": 0,
+    "oyster mushroom": 0, "vegetable broth": 0, "vegetable stock": 0, "gluten-free oat": 0,
+}
+
+# Ingredients known to belong to none of the categories.
+SAFE_INGREDIENTS = {
+    "salt", "pepper", "sugar", "water", "oil", "olive", "olive oil", "vegetable oil", "canola oil",
+    "sunflower oil", "vinegar", "onion", "garlic", "shallot", "leek", "scallion", "tomato", "potato",
+    "sweet potato", "carrot", "celery", "broccoli", "cauliflower", "cabbage", "kale", "spinach", "lettuce",
+    "cucumber", "zucchini", "courgette", "eggplant", "aubergine", "bell pepper", "chili", "chilli",
+    "jalapeno", "corn", "pea", "bean", "lentil", "chickpea", "rice", "quinoa", "mushroom", "avocado",
+    "lemon", "lime", "orange", "apple", "banana", "berry", "strawberry", "blueberry", "raspberry", "mango",
+    "pineapple", "coconut", "ginger", "cilantro", "coriander", "parsley", "basil", "oregano", "thyme",
+    "rosemary", "sage", "mint", "dill", "chive", "cumin", "paprika", "turmeric", "cinnamon", "nutmeg",
+    "bay leaf", "vanilla", "herb", "spice", "vegetable", "fruit", "squash", "butternut squash", "pumpkin",
+    "beet", "beetroot", "radish", "asparagus", "artichoke", "caper", "raisin", "date", "fig", "salsa",
+    "cornstarch", "maple syrup", "agave", "baking soda", "baking powder", "yeast", "cocoa", "cayenne",
+    "bay", "peppercorn", "mustard", "sweetcorn", "polenta", "cornmeal", "arugula", "rocket",
+}
+
+# Descriptive words ignored when deciding whether an ingredient is recognised.
+DESCRIPTIVE_WORDS = {
+    "fresh", "frozen", "dried", "dry", "ground", "chopped", "diced", "sliced", "minced", "grated", "shredded",
+    "crushed", "whole", "large", "small", "medium", "red", "green", "yellow", "white", "black", "brown",
+    "raw", "cooked", "boneless", "skinless", "extra", "virgin", "low", "fat", "sodium", "organic", "canned",
+    "can", "of", "and", "or", "paste", "sauce", "powder", "flake", "juice", "zest", "leaf", "leave", "clove",
+    "stalk", "sprig", "head", "breast", "thigh", "fillet", "wing", "leg", "piece", "baby", "sweet", "hot",
+    "smoked", "roasted", "toasted", "peeled", "halved", "cherry", "plum", "mixed", "optional", "to", "taste",
+}
+
+_WORD_PATTERN = re.compile(r"[a-z]+(?:-[a-z]+)*")
+_PHRASES = dict.fromkeys(SAFE_INGREDIENTS, 0)
+_PHRASES.update(KEYWORDS)
+_MAX_PHRASE_WORDS = max(len(phrase.split()) for phrase in _PHRASES)
+_MAX_CACHED_MASKS = 100000  # The cache is cleared when full, so memory stays bounded on streamed catalogues
+_ingredient_masks = {}  # Normalized ingredient name -> mask
+
+
+def _singular(word):
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("oes") or word.endswith("shes") or word.endswith("ches"):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and not word.endswith("us") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _classify(name):
+    """Returns the category bitmask of a normalized ingredient name."""
+    words = [_singular(word) for word in _WORD_PATTERN.findall(name)]
+    mask = 0
+    recognised = False
+    i = 0
+    while i < len(words):
+        for length in range(min(_MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            phrase = " ".join(words[i:i + length])
+            if phrase in _PHRASES:
+                mask |= _PHRASES[phrase]
+                recognised = True
+                i += length
+                break
+        else:
+            if words[i] not in DESCRIPTIVE_WORDS:
+                mask |= UNKNOWN
+            i += 1
+    return mask if recognised else mask | UNKNOWN
+
+
+def ingredient_mask(ingredient):
+    """Returns the category bitmask of an ingredient name (cached for up to 100k names)."""
+    key = ingredient.strip().lower()
+    mask = _ingredient_masks.get(key)
+    if mask is None:
+        mask = _classify(key)
+        if len(_ingredient_masks) >= _MAX_CACHED_MASKS:
+            _ingredient_masks.clear()
+        _ingredient_masks[key] = mask
+    return mask
+
+
+def recipe_mask(ingredients):
+    """Returns the OR of the category bitmasks of an iterable of ingredient names."""
+    mask = 0
+    cached = _ingredient_masks.get  # Hits directly for names that are already normalized
+    for ingredient in ingredients:
+        ingredient_bits = cached(ingredient)
+        mask |= ingredient_bits if ingredient_bits is not None else ingredient_mask(ingredient)
+    return mask
+
+
+def satisfies(mask, tag):
+    """Returns True if a recipe with category bitmask `mask` qualifies for a dietary tag.
+
+    Tags outside the taxonomy (such as cuisines or "spicy") are never inferred.
+    """
+    exclusions = DIETARY_EXCLUSIONS.get(tag.strip().lower())
+    return exclusions is not None and mask & exclusions == 0
+
+
+def contradicts(mask, tag):
+    """Returns True if recognised ingredients in `mask` rule out a dietary tag; unknown ones never do."""
+    exclusions = DIETARY_EXCLUSIONS.get(tag.strip().lower())
+    return exclusions is not None and mask & exclusions & ~UNKNOWN != 0
+
+
+def dietary_labels(mask):
+    """Returns the dietary tags a recipe with category bitmask `mask` qualifies for."""
+    return [tag for tag, exclusions in DIETARY_EXCLUSIONS.items() if mask & exclusions == 0]
+
+
+def allergen_names(mask):
+    """Returns the names of the allergen categories set in `mask`."""
+    return [name for bit, name in CATEGORY_NAMES.items() if mask & bit & ALLERGENS]
@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import CatalogueAnalyzer
+from main import Recipe
+
+
+def recipes(start, stop):
+    for i in range(start, stop):
+        tags = ["vegan", f"typo{i}"] + (["spicy"] if i % 2 == 0 else [])
+        yield Recipe(f"Recipe {i}", {"rice": "1 cup", "beans": "200g"}, ["Cook."], "Mexican", tags, 4.0)
+
+
+class TagReportTest(unittest.TestCase):
+    def test_orphan_tags_are_counted_exactly_while_they_fit_the_sample(self):
+        report = CatalogueAnalyzer(max_samples=3).add_all(recipes(0, 50)).report()
+        self.assertEqual(report["orphan_tags"], {"count": 50, "samples": ["typo0", "typo1", "typo10"]})
+        self.assertEqual(report["tags"]["spicy"], 25)
+        self.assertEqual(report["tags"]["vegan"], 50)
+
+    def test_orphan_tags_are_estimated_in_bounded_memory(self):
+        analyzer = CatalogueAnalyzer(chunk_size=1000, tag_sample_size=256).add_all(recipes(0, 20000))
+        self.assertEqual(len(analyzer._tag_sample), 256)
+        self.assertAlmostEqual(analyzer.report()["orphan_tags"]["count"], 20000, delta=2000)
+
+    def test_merged_analyzers_report_the_same_tags(self):
+        whole = CatalogueAnalyzer(chunk_size=100, tag_sample_size=64).add_all(recipes(0, 1000)).report()
+        merged = CatalogueAnalyzer(chunk_size=100, tag_sample_size=64).add_all(recipes(0, 400))
+        merged.merge(CatalogueAnalyzer(chunk_size=100, tag_sample_size=64).add_all(recipes(400, 1000)))
+        self.assertEqual(merged.report()["orphan_tags"], whole["orphan_tags"])
+        self.assertEqual(merged.report()["tags"], whole["tags"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cli
+
+
+class PlanCommandTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.recipes = self.write("recipes.jsonl", "\n".join(json.dumps(
+            {"name": name, "ingredients": {"rice": "1 cup"}, "instructions": ["Cook."], "cuisine": "Thai"})
+            for name in ("Curry", "Noodles")))
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = cli.main(list(argv))
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_plan_is_written_as_json(self):
+        status, stdout, _ = self.run_cli("plan", "--recipes", self.recipes, "--seed", "1")
+        self.assertEqual(status, 0)
+        self.assertIn(json.loads(stdout)["meals"]["Monday"]["Lunch"], ["Curry", "Noodles"])
+
+    def test_invalid_profiles_are_reported(self):
+        for text in ('{"budget": "abc"}', '["vegan"]', '{"food_on_hand": ["rice"]}'):
+            with self.subTest(profile=text):
+                profile = self.write("profile.json", text)
+                status, stdout, stderr = self.run_cli("plan", "--recipes", self.recipes, "--profile", profile)
+                self.assertEqual(status, 2)
+                self.assertEqual(stdout, "")
+                self.assertIn("invalid profile", stderr)
+
+    def test_plan_without_matching_recipes_fails(self):
+        profile = self.write("profile.json", '{"preferred_cuisines": ["French"]}')
+        status, stdout, stderr = self.run_cli("plan", "--recipes", self.recipes, "--profile", profile)
+        self.assertEqual(status, 1)
+        self.assertEqual(stdout, "")
+        self.assertIn("No recipes match", stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Recipe, RecipeDatabase
+from query import CostBetween
+
+
+class UpdateRecipeTest(unittest.TestCase):
+    def setUp(self):
+        self.db = RecipeDatabase()
+        self.db.add_recipe(Recipe("Soup", {"lentils": "1 cup"}, ["Simmer."], "Mediterranean", ["vegan"], 4.0))
+        self.db.add_recipe(Recipe("Pasta", {"spaghetti": "200g"}, ["Boil."], "Italian", cost=5.0))
+        self.soup = self.db.get_recipe_by_name("Soup")
+
+    def test_cost_is_stored_as_a_number(self):
+        self.db.update_recipe(self.soup.recipe_id, cost="6")
+        self.assertEqual(self.soup.cost, 6.0)
+        self.db.update_recipe(self.soup.recipe_id, cost=2.5)
+        names = [recipe.name for recipe in self.db.query(CostBetween(0, 10), order_by_cost=True)]
+        self.assertEqual(names, ["Soup", "Pasta"])
+
+    def test_cleared_dietary_info_keeps_the_recipe_indexed(self):
+        self.db.update_recipe(self.soup.recipe_id, dietary_info=None)
+        self.assertEqual(self.soup.dietary_info, [])
+        self.assertEqual(self.db.search_recipes({"cuisine": "Mediterranean"}), [self.soup])
+
+    def test_invalid_update_leaves_the_indexes_untouched(self):
+        with self.assertRaises(ValueError):
+            self.db.update_recipe(self.soup.recipe_id, cost="cheap")
+        with self.assertRaises(TypeError):
+            self.db.update_recipe(self.soup.recipe_id, dietary_info="vegan")
+        self.assertEqual(self.soup.cost, 4.0)
+        self.assertEqual(self.db.search_recipes({"cuisine": "Mediterranean", "dietary_info": ["vegan"]}),
+                         [self.soup])
+
+
+class RemoveRecipeTest(unittest.TestCase):
+    def setUp(self):
+        self.db = RecipeDatabase()
+        for name in ("Soup", "Stew", "Salad", "Soup"):
+            self.db.add_recipe(Recipe(name, {"lentils": "1 cup"}, ["Simmer."], "Greek"))
+
+    def test_removal_moves_the_last_recipe_into_the_freed_position(self):
+        self.db.remove_recipe(1)
+        self.assertEqual([recipe.recipe_id for recipe in self.db.recipes], [0, 3, 2])
+        self.assertIs(self.db.get_recipe_by_index(1), self.db.get_recipe_by_id(3))
+
+    def test_queries_stay_in_recipe_id_order(self):
+        self.db.remove_recipe(1)
+        results = self.db.search_recipes({"cuisine": "Greek"})
+        self.assertEqual([recipe.recipe_id for recipe in results], [0, 2, 3])
+
+    def test_name_lookup_returns_the_earliest_added_recipe(self):
+        self.db.update_recipe(0, name="Broth")
+        self.db.update_recipe(0, name="Soup")
+        self.assertEqual(self.db.get_recipe_by_name("soup").recipe_id, 0)
+        self.db.remove_recipe(0)
+        self.assertEqual(self.db.get_recipe_by_name("Soup").recipe_id, 3)
+        self.assertEqual(self.db.recipe_ids_named("soup"), [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import PlanHistory, mask_to_ids
+from main import MealPlan, Recipe, RecipeDatabase, UserProfile
+
+WEEK = datetime.date(2026, 10, 5)
+NEXT_WEEK = WEEK + datetime.timedelta(weeks=1)
+
+
+def make_database(names):
+    database = RecipeDatabase()
+    for name in names:
+        database.add_recipe(Recipe(name, {"rice": "1 cup"}, ["Cook."], "Fusion"))
+    return database
+
+
+class PlanHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def record(self, database, *names):
+        meal_plan = MealPlan(UserProfile())
+        for meal_type, name in zip(["Breakfast", "Lunch", "Dinner"], names):
+            meal_plan.add_recipe("Monday", meal_type, database.get_recipe_by_name(name))
+        PlanHistory(self.directory.name).record_plan("alice", meal_plan, WEEK)
+
+    def test_history_survives_a_reordered_catalogue(self):
+        self.record(make_database(["Soup", "Stew", "Salad"]), "Soup")
+        reordered = make_database(["Salad", "Stew", "Soup"])
+        history = PlanHistory(self.directory.name)
+        recent_ids = mask_to_ids(history.recent_mask("alice", reordered, before=NEXT_WEEK))
+        self.assertEqual([reordered.get_recipe_by_id(recipe_id).name for recipe_id in recent_ids], ["Soup"])
+
+    def test_recipes_missing_from_the_catalogue_are_ignored(self):
+        self.record(make_database(["Soup", "Stew"]), "Soup", "Stew")
+        history = PlanHistory(self.directory.name)
+        self.assertEqual(history.recent_recipes("alice", before=NEXT_WEEK), {"soup", "stew"})
+        database = make_database(["Stew"])
+        self.assertEqual(mask_to_ids(history.recent_mask("alice", database, before=NEXT_WEEK)),
+                         [database.get_recipe_by_name("Stew").recipe_id])
+
+    def test_weeks_outside_the_window_are_not_recent(self):
+        self.record(make_database(["Soup"]), "Soup")
+        history = PlanHistory(self.directory.name)
+        self.assertEqual(history.recent_recipes("alice", before=WEEK), set())
+        self.assertEqual(history.recent_recipes("alice", weeks=1, before=NEXT_WEEK + datetime.timedelta(weeks=1)),
+                         set())
+
+    def test_file_keeps_only_the_latest_weeks(self):
+        database = make_database(["Soup", "Stew"])
+        history = PlanHistory(os.path.join(self.directory.name, "nested"), max_weeks=3)
+        meal_plan = MealPlan(UserProfile())
+        meal_plan.add_recipe("Monday", "Lunch", database.get_recipe_by_name("Soup"))
+        for weeks_ago in (5, 4, 3, 2, 1, 1, 1):
+            history.record_plan("alice", meal_plan, NEXT_WEEK - datetime.timedelta(weeks=weeks_ago))
+        meal_plan.add_recipe("Monday", "Lunch", database.get_recipe_by_name("Stew"))
+        history.record_plan("alice", meal_plan, WEEK)
+
+        with open(history._path("alice"), encoding="utf-8") as file:
+            lines = file.readlines()
+        self.assertLessEqual(len(lines), 4)
+        reloaded = PlanHistory(history.directory, max_weeks=3)
+        self.assertEqual(reloaded.recent_recipes("alice", weeks=1, before=NEXT_WEEK), {"stew"})
+        self.assertEqual(reloaded.recent_recipes("alice", weeks=12, before=NEXT_WEEK), {"soup", "stew"})
+        self.assertEqual(sorted(reloaded._load("alice")),
+                         [NEXT_WEEK - datetime.timedelta(weeks=weeks_ago) for weeks_ago in (3, 2, 1)])
+
+    def test_directory_is_created_on_the_first_recorded_plan(self):
+        directory = os.path.join(self.directory.name, "later")
+        history = PlanHistory(directory)
+        self.assertEqual(history.recent_recipes("alice"), set())
+        self.assertFalse(os.path.exists(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingestion import JSONFeedSource, RecipeIngester, RetryPolicy
+from main import RecipeDatabase
+
+
+def recipe(name, cost=4.0):
+    return {"name": name, "ingredients": {"rice": "1 cup"}, "instructions": ["Cook."], "cuisine": "Thai",
+            "cost": cost}
+
+
+PAGES = {
+    "/feed/1": {"recipes": [recipe("Curry"), recipe("Noodles")], "next": "/feed/2"},
+    "/feed/2": {"recipes": [recipe("Soup")], "next": "/feed/3"},
+    "/feed/3": {"recipes": [recipe("Salad"), recipe("Curry", cost=5.0)]},
+    "/flaky": {"recipes": [recipe("Stew")]},
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves PAGES with ETags over keep-alive connections; /flaky fails once with a 503."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        with self.server.lock:
+            self.server.requests.append(path)
+            fail = path == "/flaky" and self.server.requests.count(path) == 1
+        if fail:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        page = PAGES.get(path)
+        if page is None:
+            self.send_error(404)
+            return
+        etag = f'"{path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(page).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RecipeIngesterTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.db = RecipeDatabase()
+
+    def ingester(self, etag_cache=None):
+        ingester = RecipeIngester(self.db, concurrency=1, retry_policy=RetryPolicy(backoff=0.01),
+                                  etag_cache=etag_cache)
+        self.addCleanup(ingester.pool.close)
+        return ingester
+
+    def test_follows_pagination_and_updates_known_recipes(self):
+        report = self.ingester().run([JSONFeedSource("partner", f"{self.base_url}/feed/1")])
+        self.assertEqual(self.server.requests, ["/feed/1", "/feed/2", "/feed/3"])
+        self.assertEqual((report.pages_fetched, report.recipes_added, report.recipes_updated), (3, 4, 1))
+        self.assertEqual(self.db.get_recipe_by_name("Curry").cost, 5.0)
+        self.assertEqual(report.errors, [])
+
+    def test_reuses_keep_alive_connections(self):
+        ingester = self.ingester()
+        ingester.run([JSONFeedSource("partner", f"{self.base_url}/feed/1")])
+        self.assertEqual(ingester.pool.connections_opened, 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_service_unavailable(self):
+        report = self.ingester().run([JSONFeedSource("partner", f"{self.base_url}/flaky")])
+        self.assertEqual(self.server.requests, ["/flaky", "/flaky"])
+        self.assertEqual((report.pages_fetched, report.recipes_added, report.errors), (1, 1, []))
+
+    def test_second_run_is_answered_with_not_modified(self):
+        etag_cache = {}
+        self.ingester(etag_cache).run([JSONFeedSource("partner", f"{self.base_url}/feed/1")])
+        self.assertEqual(set(etag_cache), {f"{self.base_url}/feed/{page}" for page in (1, 2, 3)})
+
+        report = self.ingester(etag_cache).run([JSONFeedSource("partner", f"{self.base_url}/feed/1")])
+        self.assertEqual((report.pages_fetched, report.pages_not_modified), (0, 3))
+        self.assertEqual((report.recipes_added, report.recipes_updated), (0, 0))
+        self.assertEqual(len(self.db.recipes), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
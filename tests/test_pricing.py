@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import MealPlan, Recipe, RecipeDatabase, UserProfile
+from pricing import PriceTable, RecipeCostTracker
+
+
+class RecipeCostTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = RecipeDatabase()
+        self.db.add_recipe(Recipe("Omelette", {"eggs": "2", "ham": "30g"}, ["Cook."], "Breakfast", cost=3.0))
+        self.omelette = self.db.get_recipe_by_name("Omelette")
+        self.tracker = RecipeCostTracker(self.db, PriceTable())
+        self.meal_plan = MealPlan(UserProfile())
+        self.meal_plan.add_recipe("Monday", "Breakfast", self.omelette)
+        self.meal_plan.add_recipe("Tuesday", "Breakfast", self.omelette)
+        self.tracker.track_plan(self.meal_plan)
+
+    def test_derived_cost_updates_plan_totals(self):
+        changed = self.tracker.apply_price_updates([("eggs", "shop", 0.30, "1"), ("ham", "shop", 20.0, "kg")])
+        self.assertEqual(changed, {self.omelette.recipe_id: 1.2})
+        self.assertEqual(self.tracker.plan_total(self.meal_plan), 2.4)
+
+    def test_removing_a_price_restores_the_entered_cost(self):
+        self.tracker.apply_price_updates([("eggs", "shop", 0.30, "1"), ("ham", "shop", 20.0, "kg")])
+        changed = self.tracker.apply_price_updates([("ham", "shop", None, "1")])
+        self.assertEqual(changed, {self.omelette.recipe_id: 3.0})
+        self.assertEqual(self.omelette.cost, 3.0)
+        self.assertEqual(self.tracker.plan_total(self.meal_plan), self.meal_plan.calculate_total_cost())
+        self.assertEqual(self.tracker.unpriced_recipes(), {self.omelette.recipe_id: {"ham"}})
+
+    def test_unpriced_recipe_keeps_its_entered_cost(self):
+        self.assertEqual(self.tracker.apply_price_updates([("eggs", "shop", 0.30, "1")]), {})
+        self.assertEqual(self.omelette.cost, 3.0)
+        self.assertEqual(self.tracker.plan_total(self.meal_plan), 6.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
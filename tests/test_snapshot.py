@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Recipe, RecipeDatabase
+from snapshot import CatalogueSnapshot, write_snapshot
+
+
+class CatalogueSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalogue.snap")
+        db = RecipeDatabase()
+        db.add_recipe(Recipe("Soup", {"lentils": "1 cup"}, ["Simmer."], "Mediterranean", ["vegan"], 4.0))
+        db.add_recipe(Recipe("Tacos", {"chicken": "300g"}, ["Fill."], "Mexican", cost=8.0))
+        db.add_recipe(Recipe("Pasta", {"spaghetti": "200g"}, ["Boil."], "Italian", ["vegetarian"], 5.0))
+        write_snapshot(db, self.path)
+
+    def test_row_queries_return_lists_that_outlive_the_snapshot(self):
+        with CatalogueSnapshot(self.path) as snapshot:
+            by_cost = snapshot.rows_in_cost_range(4.0, 6.0)
+            by_cuisine = snapshot.find_rows(cuisine="Mexican")
+        self.assertEqual([by_cost, by_cuisine], [[0, 2], [1]])
+
+    def test_dietary_queries_use_the_tag_index(self):
+        with CatalogueSnapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.find_rows(dietary_info=["Vegan"]), [0, 2])
+            self.assertEqual(snapshot.find_rows(dietary_info="gluten-free"), [0, 1])
+            self.assertEqual(snapshot.find_rows(dietary_info=["vegan", "gluten-free"]), [0])
+            self.assertEqual(snapshot.find_rows(cuisine="Italian", dietary_info=["vegan"]), [2])
+            self.assertEqual(snapshot.find_rows(dietary_info=["keto"]), [])
+
+    def test_close_tolerates_outstanding_views(self):
+        snapshot = CatalogueSnapshot(self.path)
+        view = snapshot._costs[0:2]
+        snapshot.close()
+        self.assertEqual(view.tolist(), [4.0, 8.0])
+
+    def test_lookup_by_name(self):
+        with CatalogueSnapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.get_recipe_by_name("pasta").cost, 5.0)
+            self.assertIsNone(snapshot.get_recipe_by_name("Stew"))
+
+
+if __name__ == "__main__":
+    unittest.main()
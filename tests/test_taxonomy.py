@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import taxonomy
+from main import Recipe, RecipeDatabase
+from query import HasTag
+from ui_enhancement import infer_dietary_tags
+
+
+def labels(*ingredients):
+    return set(taxonomy.dietary_labels(taxonomy.recipe_mask(ingredients)))
+
+
+class IngredientMaskTest(unittest.TestCase):
+    def test_generic_nuts_are_nut_allergens(self):
+        for name in ("mixed nuts", "nuts", "chopped nuts"):
+            with self.subTest(name=name):
+                self.assertTrue(taxonomy.ingredient_mask(name) & taxonomy.TREE_NUT)
+                self.assertNotIn("nut-free", labels(name))
+
+    def test_seafood_is_not_vegetarian(self):
+        for name in ("shellfish", "squid", "octopus", "calamari", "worcestershire sauce"):
+            with self.subTest(name=name):
+                self.assertNotIn("vegetarian", labels(name))
+                self.assertNotIn("vegan", labels(name))
+
+    def test_cured_meats_are_not_vegetarian(self):
+        for name in ("pancetta", "guanciale", "diced pancetta"):
+            with self.subTest(name=name):
+                self.assertTrue(taxonomy.ingredient_mask(name) & taxonomy.MEAT)
+                self.assertNotIn("vegetarian", labels(name))
+
+    def test_wheat_products_are_not_gluten_free(self):
+        for name in ("gnocchi", "croissant", "couscous"):
+            with self.subTest(name=name):
+                self.assertNotIn("gluten-free", labels(name))
+
+    def test_marzipan_contains_tree_nuts(self):
+        self.assertIn("tree nuts", taxonomy.allergen_names(taxonomy.ingredient_mask("marzipan")))
+
+    def test_phrases_override_keywords(self):
+        self.assertEqual(taxonomy.ingredient_mask("oyster mushrooms"), 0)
+        self.assertEqual(taxonomy.ingredient_mask("peanut butter"), taxonomy.PEANUT)
+        self.assertEqual(taxonomy.ingredient_mask("eggplant"), 0)
+        self.assertEqual(taxonomy.ingredient_mask("coconut milk"), 0)
+
+    def test_unrecognised_ingredients_block_every_label(self):
+        self.assertTrue(taxonomy.ingredient_mask("dragon fruit compote") & taxonomy.UNKNOWN)
+        self.assertEqual(labels("rice", "dragon fruit compote"), set())
+        self.assertEqual(labels("sauce"), set())
+
+    def test_recognised_plant_ingredients_are_vegan(self):
+        self.assertEqual(labels("rice", "chopped onion", "olive oil", "tomatoes", "fresh basil"),
+                         set(taxonomy.DIETARY_EXCLUSIONS))
+
+
+class InferredTagFilteringTest(unittest.TestCase):
+    def setUp(self):
+        self.db = RecipeDatabase()
+        self.db.add_recipe(Recipe("Carbonara", {"spaghetti": "200g", "pancetta": "100g", "eggs": "2"},
+                                  ["Cook."], "Italian"))
+        self.db.add_recipe(Recipe("Risotto", {"rice": "300g", "mushrooms": "200g", "onion": "1"},
+                                  ["Stir."], "Italian"))
+        self.db.add_recipe(Recipe("Mystery Stew", {"rice": "1 cup", "dragon fruit compote": "2 tbsp"},
+                                  ["Simmer."], "Fusion", ["Vegetarian"]))
+        self.db.add_recipe(Recipe("Stir-fry", {"chicken breast": "300g", "soy sauce": "2 tbsp", "rice": "1 cup"},
+                                  ["Fry."], "Asian", ["gluten-free", "vegan"]))
+
+    def test_meat_recipe_is_not_returned_for_vegetarian(self):
+        names = [recipe.name for recipe in self.db.query(HasTag("vegetarian"))]
+        self.assertEqual(names, ["Risotto", "Mystery Stew"])
+
+    def test_unrecognised_ingredient_keeps_only_explicit_tags(self):
+        stew = self.db.get_recipe_by_name("Mystery Stew")
+        self.assertEqual(stew.dietary_tags(), {"vegetarian"})
+        self.assertFalse(stew.has_dietary_tag("nut-free"))
+
+    def test_contradicted_explicit_tags_do_not_count(self):
+        stir_fry = self.db.get_recipe_by_name("Stir-fry")
+        self.assertNotIn(stir_fry, self.db.search_recipes({"dietary_info": ["vegan"]}))
+        self.assertNotIn(stir_fry, self.db.search_recipes({"dietary_info": ["gluten-free"]}))
+        self.assertFalse(stir_fry.has_dietary_tag("vegan"))
+        self.assertEqual(stir_fry.dietary_tags(), {"dairy-free", "egg-free", "nut-free"})
+        self.assertEqual(stir_fry.allergens(), ["gluten", "soy"])
+
+    def test_ui_drops_contradicted_tags(self):
+        self.assertNotIn("gluten-free", infer_dietary_tags(["chicken breast", "soy sauce", "rice"], ["gluten-free"]))
+        self.assertIn("vegetarian", infer_dietary_tags(["rice", "dragon fruit compote"], ["vegetarian"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
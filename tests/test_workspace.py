@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workspace import WorkspaceError, load_workspace, save_workspace
+
+
+class WorkspaceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "workspace.jsonl")
+        self.recipes = {"Chili": {"ingredients": ["beans"], "dietary": ["vegan"], "cuisine": "Mexican", "cost": 5},
+                        "Soup": {"ingredients": ["lentils"], "dietary": [], "cuisine": "Greek", "cost": 4}}
+        save_workspace(self.path, self.recipes, {"Monday": {"Lunch": "Soup"}}, {"budget": 50}, fsync=False)
+
+    def test_round_trip(self):
+        self.assertEqual(load_workspace(self.path), (self.recipes, {"Monday": {"Lunch": "Soup"}}, {"budget": 50}))
+
+    def test_undecodable_lines_are_skipped(self):
+        with open(self.path, "ab") as file:
+            file.write(b'{"name": "Caf\xe9", "cuisine": "French"}\n')
+        recipes, _, _ = load_workspace(self.path)
+        self.assertEqual(recipes, self.recipes)
+
+    def test_other_files_are_rejected(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('{"name": "Chili"}\n')
+        with self.assertRaises(WorkspaceError):
+            load_workspace(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
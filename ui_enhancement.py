@@ -1,11 +1,29 @@
-```python
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
+import os
+import queue
 import random
+import threading
+
+import taxonomy
+from workspace import WorkspaceError, WorkspaceReader, save_workspace
+
+AUTOSAVE_DELAY_MS = 2000  # Quiet period after the last change before the workspace is saved
+LOAD_BATCH_SIZE = 2000  # Recipes read from the workspace per batch
+LOAD_POLL_MS = 20
+
+
+def infer_dietary_tags(ingredients, dietary):
+    """Returns the chosen dietary tags that the ingredients allow, plus those inferred from them (see taxonomy.py)."""
+    mask = taxonomy.recipe_mask(ingredients)
+    tags = [tag for tag in dietary if tag and tag != "none" and not taxonomy.contradicts(mask, tag)]
+    tags.extend(tag for tag in taxonomy.dietary_labels(mask) if tag not in tags)
+    return tags
+
 
 class MindfulMealPlannerApp:
-    def __init__(self, root):
+    def __init__(self, root, workspace_path="workspace.jsonl"):
         self.root = root
         self.root.title("Mindful Meal Planner")
         self.root.geometry("800x600")
@@ -17,15 +35,31 @@ class MindfulMealPlannerApp:
             "Vegetarian Chili": {"ingredients": ["beans", "tomatoes", "corn", "peppers", "onion"], "dietary": ["vegetarian", "vegan"], "cuisine": "Mexican", "cost": 5},
             "Salmon with Roasted Vegetables": {"ingredients": ["salmon", "asparagus", "potatoes", "lemon", "olive oil"], "dietary": ["gluten-free"], "cuisine": "Mediterranean", "cost": 12}
         }
+        for details in self.recipes.values():
+            details["dietary"] = infer_dietary_tags(details["ingredients"], details["dietary"])
         self.user_preferences = {"dietary_restrictions": [], "cuisine_preferences": [], "budget": 0, "inventory": []}
         self.meal_plan = {}
 
+        # Workspace persistence (see workspace.py)
+        self.workspace_path = workspace_path
+        self._dirty = False
+        self._autosave_job = None
+        self._save_thread = None
+        self._save_error = None
+        self._load_queue = None  # Batches of recipes read by the loader thread; None when not loading
+
         # UI elements
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.open_workspace()
 
     def create_widgets(self):
         """Creates the main UI elements for the application."""
 
+        # Status bar (loading and autosave progress)
+        self.status_var = tk.StringVar()
+        ttk.Label(self.root, textvariable=self.status_var, anchor="w").pack(side="bottom", fill="x", padx=5)
+
         # Notebook for tabbed interface
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill="both", expand=True)
@@ -160,6 +194,7 @@ class MindfulMealPlannerApp:
             self.user_preferences["cuisine_preferences"] = [option for option in self.cuisine_options if self.cuisine_vars[option].get()]
             self.user_preferences["budget"] = self.budget_var.get()
             self.user_preferences["inventory"] = [item.strip() for item in self.inventory_var.get().split(",")] if self.inventory_var.get() else []
+            self.mark_dirty()
 
             messagebox.showinfo("Success", "Preferences saved successfully!")
 
@@ -214,6 +249,7 @@ class MindfulMealPlannerApp:
                             messagebox.showinfo("Info", f"Cannot generate a full meal plan within your budget. Current cost: {total_cost}, Budget: {self.user_preferences['budget']}")
                             return
 
+            self.mark_dirty()
             messagebox.showinfo("Success", "Meal plan generated successfully!")
 
         except Exception as e:
@@ -226,6 +262,7 @@ class MindfulMealPlannerApp:
             for item in self.meal_plan_tree.get_children():
                 self.meal_plan_tree.delete(item)
             self.meal_plan = {}  # Clear the internal data structure
+            self.mark_dirty()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clear meal plan: {e}")
 
@@ -235,7 +272,7 @@ class MindfulMealPlannerApp:
             name = self.recipe_name_var.get()
             ingredients = [item.strip() for item in self.ingredients_var.get().split(",")] if self.ingredients_var.get() else []
             cuisine = self.cuisine_choice.get()
-            dietary = [self.dietary_choice.get()]
+            dietary = infer_dietary_tags(ingredients, [self.dietary_choice.get()])
             cost = self.cost_var.get()
 
             if not name or not ingredients or not cuisine or not cost:
@@ -248,6 +285,7 @@ class MindfulMealPlannerApp:
 
 
             self.recipes[name] = {"ingredients": ingredients, "cuisine": cuisine, "dietary": dietary, "cost": cost}
+            self.mark_dirty()
             self.populate_recipe_list()
             messagebox.showinfo("Success", "Recipe added successfully!")
             self.clear_recipe_fields()
@@ -267,7 +305,7 @@ class MindfulMealPlannerApp:
             new_name = self.recipe_name_var.get()
             ingredients = [item.strip() for item in self.ingredients_var.get().split(",")] if self.ingredients_var.get() else []
             cuisine = self.cuisine_choice.get()
-            dietary = [self.dietary_choice.get()]  # Consider handling multiple dietary options
+            dietary = infer_dietary_tags(ingredients, [self.dietary_choice.get()])
             cost = self.cost_var.get()
 
             if not new_name or not ingredients or not cuisine or not cost:
@@ -287,7 +325,7 @@ class MindfulMealPlannerApp:
             self.recipes[new_name]["cuisine"] = cuisine
             self.recipes[new_name]["dietary"] = dietary
             self.recipes[new_name]["cost"] = cost
-
+            self.mark_dirty()
 
             self.populate_recipe_list()
             messagebox.showinfo("Success", "Recipe updated successfully!")
@@ -306,6 +344,7 @@ class MindfulMealPlannerApp:
 
             name = self.recipe_tree.item(selected_item[0])['values'][0]
             del self.recipes[name]
+            self.mark_dirty()
             self.populate_recipe_list()
             messagebox.showinfo("Success", "Recipe deleted successfully!")
             self.clear_recipe_fields()
@@ -333,20 +372,167 @@ class MindfulMealPlannerApp:
         self.cost_var.set(0)
 
     def save_meal_plan(self):
-        """Saves the meal plan to a file."""
+        """Saves the meal plan, with the rest of the workspace, right away instead of after the autosave delay."""
+        self._dirty = True
+        self.schedule_autosave(delay_ms=0)
+
+    def set_status(self, text):
+        """Shows a message in the status bar."""
+        self.status_var.set(text)
+
+    def show_preferences(self):
+        """Updates the Preferences tab from self.user_preferences."""
+        for option, var in self.dietary_vars.items():
+            var.set(option in self.user_preferences.get("dietary_restrictions", []))
+        for option, var in self.cuisine_vars.items():
+            var.set(option in self.user_preferences.get("cuisine_preferences", []))
+        self.budget_var.set(self.user_preferences.get("budget", 0))
+        self.inventory_var.set(", ".join(self.user_preferences.get("inventory", [])))
+
+    def open_workspace(self):
+        """Restores the saved workspace, if there is one.
+
+        Preferences and the meal plan are restored immediately; recipes are read by a
+        background thread and added to the recipe list in batches while the UI stays usable.
+        """
+        if not os.path.exists(self.workspace_path):
+            return
         try:
-            filename = "meal_plan.txt"  # Default filename
-            with open(filename, "w") as file:
-                for day, meals in self.meal_plan.items():
-                    file.write(f"{day}:\n")
-                    for meal, recipe in meals.items():
-                        file.write(f"  {meal}: {recipe}\n")
-            messagebox.showinfo("Success", f"Meal plan saved to {filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save meal plan: {e}")
+            reader = WorkspaceReader(self.workspace_path)
+        except WorkspaceError as e:
+            messagebox.showerror("Error", f"Failed to open workspace: {e}")
+            return
+
+        self.user_preferences.update(reader.user_preferences)
+        self.show_preferences()
+        self.meal_plan = reader.meal_plan
+        for day, meals in self.meal_plan.items():
+            for meal, recipe in meals.items():
+                self.meal_plan_tree.insert("", "end", values=(day, meal, recipe))
+        self.recipes = {}
+        self.populate_recipe_list()
+
+        self._load_queue = queue.Queue(maxsize=8)
+        threading.Thread(target=self._read_recipes, args=(reader, self._load_queue), daemon=True).start()
+        self.set_status(f"Loading {reader.recipe_count} recipes...")
+        self.root.after(LOAD_POLL_MS, self._poll_loading)
+
+    @staticmethod
+    def _read_recipes(reader, load_queue):
+        """Loader thread: reads recipe batches into `load_queue`, ending with None."""
+        try:
+            for batch in reader.iter_recipe_batches(LOAD_BATCH_SIZE):
+                load_queue.put(batch)
+        except (OSError, ValueError) as e:
+            load_queue.put(WorkspaceError(f"Failed to load recipes: {e}"))
+        load_queue.put(None)
+
+    def _poll_loading(self):
+        """Adds the recipe batches read so far to the app and keeps polling until the loader is done."""
+        if self._drain_load_queue(block=False):
+            self.root.after(LOAD_POLL_MS, self._poll_loading)
+
+    def _drain_load_queue(self, block):
+        """Moves loaded batches into self.recipes; returns True while more are expected."""
+        while self._load_queue is not None:
+            try:
+                item = self._load_queue.get(block=block)
+            except queue.Empty:
+                return True
+            if item is None or isinstance(item, WorkspaceError):
+                self._load_queue = None
+                if item is None:
+                    self.set_status(f"Loaded {len(self.recipes)} recipes")
+                else:
+                    self._redirect_saves(item)
+                if self._dirty:
+                    self.schedule_autosave()
+                return False
+            for name, details in item:
+                if name not in self.recipes:  # Keep recipes added or edited while loading
+                    self.recipes[name] = details
+                    self.recipe_tree.insert("", "end", values=(name, details.get("cuisine"), details.get("cost")))
+            if not block:
+                return True  # One batch per tick keeps the UI responsive
+        return False
+
+    def _redirect_saves(self, error):
+        """After a failed load, saves to a separate file so the partial catalogue never replaces the workspace."""
+        original_path = self.workspace_path
+        base, extension = os.path.splitext(original_path)
+        self.workspace_path = f"{base}.recovered{extension}"
+        self.set_status(f"{error}; changes are saved to {self.workspace_path}")
+        messagebox.showwarning("Warning", f"{error}\nOnly {len(self.recipes)} recipes were loaded, so '{original_path}' "
+                                          f"is left untouched and changes are saved to '{self.workspace_path}'.")
+
+    def mark_dirty(self):
+        """Records an unsaved change and restarts the autosave countdown."""
+        self._dirty = True
+        self.schedule_autosave()
+
+    def schedule_autosave(self, delay_ms=AUTOSAVE_DELAY_MS):
+        """Saves the workspace in the background once no change has been made for `delay_ms`."""
+        if self._autosave_job is not None:
+            self.root.after_cancel(self._autosave_job)
+        self._autosave_job = self.root.after(delay_ms, self._autosave)
+
+    def _state(self):
+        """Returns a copy of the app state that a background thread can serialize."""
+        recipes = {name: dict(details) for name, details in self.recipes.items()}
+        meal_plan = {day: dict(meals) for day, meals in self.meal_plan.items()}
+        return recipes, meal_plan, dict(self.user_preferences)
+
+    def _autosave(self):
+        self._autosave_job = None
+        if self._load_queue is not None:
+            return  # Saving now would drop the recipes not loaded yet; retried when loading finishes
+        if self._save_thread is not None and self._save_thread.is_alive():
+            self.schedule_autosave()
+            return
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._save_error = None
+        self._save_thread = threading.Thread(target=self._write_workspace, args=self._state(), daemon=True)
+        self._save_thread.start()
+        self.set_status("Saving...")
+        self.root.after(LOAD_POLL_MS, self._poll_save)
+
+    def _write_workspace(self, recipes, meal_plan, user_preferences):
+        """Saver thread: writes a copy of the app state to the workspace file."""
+        try:
+            save_workspace(self.workspace_path, recipes, meal_plan, user_preferences)
+        except WorkspaceError as e:
+            self._save_error = e
+
+    def _poll_save(self):
+        if self._save_thread.is_alive():
+            self.root.after(LOAD_POLL_MS, self._poll_save)
+        elif self._save_error is not None:
+            self._dirty = True
+            self.set_status(f"Autosave failed: {self._save_error}")
+        else:
+            self.set_status(f"Saved {datetime.now():%H:%M:%S}")
+
+    def on_close(self):
+        """Saves unsaved changes before closing the window."""
+        if self._autosave_job is not None:
+            self.root.after_cancel(self._autosave_job)
+            self._autosave_job = None
+        if self._load_queue is not None:
+            self._drain_load_queue(block=True)
+        if self._save_thread is not None:
+            self._save_thread.join()
+            self._dirty = self._dirty or self._save_error is not None
+        if self._dirty:
+            try:
+                save_workspace(self.workspace_path, self.recipes, self.meal_plan, self.user_preferences)
+            except WorkspaceError as e:
+                if not messagebox.askyesno("Error", f"Failed to save workspace: {e}\nQuit anyway?"):
+                    return
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = MindfulMealPlannerApp(root)
     root.mainloop()
-```
\ No newline at end of file
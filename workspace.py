@@ -0,0 +1,117 @@
+"""Workspace files holding the full state of the Tk app (ui_enhancement.py).
+
+A workspace is a JSON-lines file. The first line is a header with the user
+preferences, the current meal plan and the number of recipes; every following
+line is one recipe:
+
+    {"format": "mindful-meal-planner-workspace", "version": 1, "recipe_count": 2, ...}
+    {"name": "Vegetarian Chili", "ingredients": ["beans", "corn"], "dietary": ["vegan"], "cuisine": "Mexican", "cost": 5}
+
+Because the small state comes first, opening a workspace only reads one line;
+the recipes are streamed in batches afterwards (see WorkspaceReader), so large
+workspaces open without blocking the UI. save_workspace() writes a temporary
+file next to the workspace and renames it over the old one, so an interrupted
+save never leaves a truncated workspace behind.
+"""
+import json
+import os
+
+FORMAT = "mindful-meal-planner-workspace"
+FORMAT_VERSION = 1
+
+_SEPARATORS = (",", ":")
+
+
+class WorkspaceError(Exception):
+    """Raised when a workspace cannot be read or written."""
+
+
+def save_workspace(path, recipes, meal_plan, user_preferences, fsync=True):
+    """Writes the app state to `path`, replacing it atomically.
+
+    `recipes` maps recipe names to their details ({"ingredients", "dietary",
+    "cuisine", "cost"}), `meal_plan` is {day: {meal: recipe name}}.
+    """
+    temp_path = f"{path}.tmp"
+    header = {"format": FORMAT, "version": FORMAT_VERSION, "recipe_count": len(recipes),
+              "user_preferences": user_preferences, "meal_plan": meal_plan}
+    try:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(header, separators=_SEPARATORS) + "\n")
+            for name, details in recipes.items():
+                file.write(json.dumps({"name": name, **details}, separators=_SEPARATORS) + "\n")
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise WorkspaceError(f"Could not save workspace '{path}': {e}")
+
+
+class WorkspaceReader:
+    """Reads a workspace header eagerly and its recipes lazily, in batches."""
+
+    def __init__(self, path):
+        """Opens the workspace at `path` and reads its header."""
+        self.path = path
+        try:
+            self._file = open(path, "rb")  # Lines are decoded one by one, so a bad byte only loses its line
+        except OSError as e:
+            raise WorkspaceError(f"Could not open workspace '{path}': {e}")
+        try:
+            header = json.loads(self._file.readline())
+            if not isinstance(header, dict) or header.get("format") != FORMAT:
+                raise ValueError("not a workspace file")
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"unsupported version {header.get('version')}")
+        except ValueError as e:
+            self._file.close()
+            raise WorkspaceError(f"Could not read workspace '{path}': {e}")
+        self.recipe_count = header.get("recipe_count", 0)
+        self.user_preferences = header.get("user_preferences") or {}
+        self.meal_plan = header.get("meal_plan") or {}
+
+    def iter_recipe_batches(self, batch_size=5000):
+        """Yields lists of up to `batch_size` (name, details) pairs, skipping malformed or undecodable lines."""
+        batch = []
+        try:
+            for line in self._file:
+                if not line.strip():
+                    continue
+                try:
+                    details = json.loads(line)
+                    name = details.pop("name")
+                except (ValueError, KeyError, AttributeError, TypeError):
+                    print(f"Warning: Skipping malformed recipe in workspace '{self.path}'.")
+                    continue
+                batch.append((name, details))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            self.close()
+
+    def close(self):
+        """Closes the workspace file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_workspace(path):
+    """Reads a whole workspace and returns (recipes, meal_plan, user_preferences)."""
+    with WorkspaceReader(path) as reader:
+        recipes = {}
+        for batch in reader.iter_recipe_batches():
+            recipes.update(batch)
+        return recipes, reader.meal_plan, reader.user_preferences